@@ -0,0 +1,171 @@
+import asyncio
+import json
+import os
+import uuid
+from http import HTTPStatus
+
+import lambda_handler
+
+from ds_ticat.LatencyMetrics import CONTENT_TYPE, METRICS
+from ds_ticat.MicroBatcher import MicroBatcher
+
+MAX_BODY_BYTES = int(os.environ.get("ASYNC_MAX_BODY_BYTES", 10 * 1024 * 1024))
+# Seconds a client may take to send the request head and the body, and to start the next keep-alive request
+READ_TIMEOUT_SECONDS = float(os.environ.get("ASYNC_READ_TIMEOUT_SECONDS", 30))
+IDLE_TIMEOUT_SECONDS = float(os.environ.get("ASYNC_IDLE_TIMEOUT_SECONDS", 60))
+
+
+class AsyncLambdaServer:
+    """
+    Serves the Lambda handler over HTTP on an asyncio event loop.
+    Concurrent single-text requests are grouped into micro-batches by a MicroBatcher.
+    """
+
+    def __init__(self, host="0.0.0.0", port=8080, max_batch_size=64, max_wait_ms=5):
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(
+            lambda_handler.predict_texts if lambda_handler.MODEL_MANAGER else self._model_not_loaded,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+        )
+
+    @staticmethod
+    def _model_not_loaded(texts):
+        raise RuntimeError(f"Model is not loaded: {lambda_handler.MODEL_LOAD_ERROR}")
+
+    async def handle_request(self, method, path, body):
+        """
+        Returns the status code and JSON payload for one request, matching the Flask wrapper.
+        """
+        if method != "POST" or path != "/":
+            return HTTPStatus.NOT_FOUND, "Not found"
+
+        # Decoded once up front, so a body that is not UTF-8 is rejected here instead of failing
+        # on the handler path, where json.loads would otherwise accept UTF-16 and UTF-32 bytes
+        try:
+            body = body.decode("utf-8")
+        except UnicodeDecodeError as e:
+            return HTTPStatus.BAD_REQUEST, f"Request body is not valid UTF-8: {str(e)}"
+
+        try:
+            processed_event = json.loads(body)
+        except ValueError as e:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, f"Error processing request: {str(e)}"
+
+        if isinstance(processed_event, dict) and isinstance(processed_event.get("text"), str):
+            text = processed_event["text"]
+            try:
+                sentiment, confidence = await self.batcher.predict(text)
+            except Exception as e:
+                return HTTPStatus.INTERNAL_SERVER_ERROR, f"Error processing request: {str(e)}"
+            return HTTPStatus.OK, {
+                "review_id": str(uuid.uuid4()),
+                "sentiment": str(sentiment),
+                "confidence": float(confidence),
+                "text": text,
+            }
+
+        # Batch bodies and invalid input take the regular handler path, off the event loop
+        event = {"body": body}
+        result = await asyncio.get_running_loop().run_in_executor(None, lambda_handler.lambda_handler, event, {})
+        return result["statusCode"], json.loads(result["body"])
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT_SECONDS)
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, version, headers = await asyncio.wait_for(
+                        self._read_head(reader, request_line), READ_TIMEOUT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    await self._write_response(writer, HTTPStatus.REQUEST_TIMEOUT, "Request head timed out")
+                    break
+
+                # Only Content-Length framed bodies are supported, the bytes of an unparsed chunked
+                # body would otherwise be read as the next request on this connection
+                if "transfer-encoding" in headers:
+                    await self._write_response(
+                        writer, HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding is not supported, send Content-Length"
+                    )
+                    break
+                content_length = int(headers.get("content-length", 0))
+                if content_length < 0:
+                    await self._write_response(writer, HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+                    break
+                if content_length > MAX_BODY_BYTES:
+                    await self._write_response(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+                    break
+                try:
+                    body = await asyncio.wait_for(reader.readexactly(content_length), READ_TIMEOUT_SECONDS)
+                except asyncio.TimeoutError:
+                    await self._write_response(writer, HTTPStatus.REQUEST_TIMEOUT, "Request body timed out")
+                    break
+
+                path = path.split("?")[0]
+                if method == "GET" and path == "/metrics":
+                    await self._write_response(writer, HTTPStatus.OK, METRICS.render(), CONTENT_TYPE)
+                else:
+                    with METRICS.time("request"):
+                        status, payload = await self.handle_request(method, path, body)
+                    await self._write_response(writer, status, payload)
+
+                if headers.get("connection", "").lower() == "close" or version == "HTTP/1.0":
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_head(reader, request_line):
+        method, path, version = request_line.decode("latin-1").split()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method, path, version, headers
+
+    @staticmethod
+    async def _write_response(writer, status, payload, content_type=None):
+        status = HTTPStatus(status)
+        if content_type is None:
+            content_type = "application/json"
+            payload = json.dumps(payload)
+        data = payload.encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def serve(self):
+        await self.batcher.start()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"Async server listening on {self.host}:{self.port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def main():
+    server = AsyncLambdaServer(
+        port=int(os.environ.get("PORT", 8080)),
+        max_batch_size=int(os.environ.get("ASYNC_MAX_BATCH_SIZE", 64)),
+        max_wait_ms=float(os.environ.get("ASYNC_MAX_WAIT_MS", 5)),
+    )
+    asyncio.run(server.serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,78 @@
+import glob
 import json
+import os
 
 import lambda_handler
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
+
+from ds_ticat.LatencyMetrics import CONTENT_TYPE, METRICS
+from ds_ticat.RequestProfiler import RequestProfiler
 
 app = Flask(__name__)
+# Worker and thread counts of the pre-fork mode, SERVER_WORKERS and SERVER_THREADS override them
+SERVICE_CONFIG = os.environ.get(
+    "SERVICE_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "service.config")
+)
+# Workers of the pre-fork mode export their histograms here and /metrics merges them
+METRICS_DIR = os.environ.get("METRICS_DIR")
+# TICAT_PROFILE_EVERY=N profiles one in N requests into TICAT_PROFILE_DIR
+PROFILER = RequestProfiler.from_env()
 
 
 @app.route("/", methods=["POST"])
 def handle_request():
-    raw_data = request.get_data(as_text=True)
-    event = {"body": raw_data}
-    context = {}
+    with PROFILER.profile(), METRICS.time("request"):
+        raw_data = request.get_data(as_text=True)
+        event = {"body": raw_data}
+        context = {}
+
+        # Call the lambda_handler function
+        result = lambda_handler.lambda_handler(event, context)
+        if isinstance(result["body"], str):
+            result["body"] = json.loads(result["body"])
+
+        # Return the result
+        return jsonify(result["body"]), result["statusCode"]
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    snapshot = METRICS.read_snapshots(METRICS_DIR) if METRICS_DIR else None
+    return Response(METRICS.render(snapshot), content_type=CONTENT_TYPE)
 
-    # Call the lambda_handler function
-    result = lambda_handler.lambda_handler(event, context)
-    if isinstance(result["body"], str):
-        result["body"] = json.loads(result["body"])
 
-    # Return the result
-    return jsonify(result["body"]), result["statusCode"]
+def serve_prefork():
+    """
+    Forks one worker per configured process after lambda_handler has loaded the model,
+    so all workers share the memory-mapped artifact and the interpreter state copy-on-write.
+    """
+    global METRICS_DIR
+    import prefork_server
+
+    workers, threads = prefork_server.load_server_config(SERVICE_CONFIG)
+    if METRICS.enabled:
+        METRICS_DIR = METRICS_DIR or "/tmp/ticat_metrics"
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        # Only the snapshots of earlier workers are removed, METRICS_DIR may hold other files
+        for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+            os.remove(path)
+
+    def after_fork():
+        if METRICS.enabled:
+            METRICS.start_exporter(METRICS_DIR)
+
+    port = int(os.environ.get("PORT", 8080))
+    prefork_server.serve(app, port=port, workers=workers, threads=threads, after_fork=after_fork)
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8080)
+    # SERVER_MODE=async serves through the asyncio front-end that micro-batches concurrent requests,
+    # SERVER_MODE=prefork through one process per CPU sharing the loaded model
+    if os.environ.get("SERVER_MODE") == "async":
+        import lambda_async_server
+
+        lambda_async_server.main()
+    elif os.environ.get("SERVER_MODE") == "prefork":
+        serve_prefork()
+    else:
+        app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
@@ -1,56 +1,180 @@
 # Copyright Amazon.com, Inc. or its affiliates. All Rights Reserved.
 # SPDX-License-Identifier: MIT-0
+import base64
 import json
+import os
 import uuid
-from ds_ticat.ModelManager import ModelManager
+
+from ds_ticat.InferenceModel import InferenceModel
+from ds_ticat.LatencyMetrics import METRICS
+from ds_ticat.PredictionCache import PredictionCache
+
+
+def load_model_manager():
+    """
+    Loads the prebuilt model artifact. Training never happens on the request path,
+    so only the inference module is imported and scikit-learn stays out of the cold start.
+    """
+    model_manager = InferenceModel(model_dir=os.environ.get("MODEL_DIR"))
+    model_manager.load_model(use_artifact=True)
+    return model_manager
+
+
+# Load the model once per container at init, warm invocations reuse it
+try:
+    MODEL_MANAGER = load_model_manager()
+    MODEL_LOAD_ERROR = None
+except Exception as e:
+    MODEL_MANAGER = None
+    MODEL_LOAD_ERROR = e
+    print(f"Failed to load model: {e}")
+
+# Repeated texts like auto-replies are answered from the cache, disabled with PREDICTION_CACHE_SIZE=0
+PREDICTION_CACHE = PredictionCache.from_env()
+
+
+def predict_texts(texts):
+    """
+    Predicts a batch of texts, through the prediction cache if it is enabled.
+    """
+    with METRICS.time("predict"):
+        if PREDICTION_CACHE is not None:
+            return PREDICTION_CACHE.predict_batch(MODEL_MANAGER, texts)
+        return MODEL_MANAGER.predict_batch(texts)
+
+
+def record_identifier(record):
+    """
+    Returns the identifier Lambda expects in batchItemFailures for an SQS, Kinesis or DynamoDB stream record.
+    """
+    if "dynamodb" in record:
+        return record["dynamodb"].get("SequenceNumber")
+    if "kinesis" in record:
+        return record["kinesis"].get("sequenceNumber")
+    return record.get("messageId")
+
+
+def is_scorable_record(record):
+    """
+    DynamoDB stream records only carry a ticket text for INSERT and MODIFY events with a NewImage.
+    REMOVE events and keys-only records are acknowledged, failing them would block the shard with retries.
+    """
+    if "dynamodb" in record:
+        return record.get("eventName") in ("INSERT", "MODIFY") and "NewImage" in record["dynamodb"]
+    return True
+
+
+def record_text(record):
+    """
+    Extracts the ticket text of a stream or queue record.
+    """
+    if "dynamodb" in record:
+        return record["dynamodb"]["NewImage"]["content"]["S"]
+    if "kinesis" in record:
+        payload = json.loads(base64.b64decode(record["kinesis"]["data"]))
+    else:
+        payload = json.loads(record["body"])
+    return payload["text"]
+
+
+def predict_items(items):
+    """
+    Scores (identifier, text) pairs with a single batched prediction.
+    Items without a valid text are reported as failures instead of failing the whole batch.
+    """
+    valid_items = [(identifier, text) for identifier, text in items if isinstance(text, str)]
+    failures = [{"itemIdentifier": identifier} for identifier, text in items if not isinstance(text, str)]
+    results = []
+    if valid_items:
+        sentiments, confidences = predict_texts([text for identifier, text in valid_items])
+        for (identifier, text), sentiment, confidence in zip(valid_items, sentiments, confidences):
+            results.append(
+                {"record_id": identifier, "sentiment": str(sentiment), "confidence": float(confidence), "text": text}
+            )
+    return results, failures
+
+
+def handle_records(records):
+    items = []
+    for record in records:
+        if not is_scorable_record(record):
+            print(f"Skipping {record.get('eventName')} record {record_identifier(record)} without a NewImage")
+            continue
+        try:
+            items.append((record_identifier(record), record_text(record)))
+        except Exception as e:
+            print(f"Invalid record {record_identifier(record)}: {e}")
+            items.append((record_identifier(record), None))
+
+    try:
+        if MODEL_MANAGER is None:
+            raise RuntimeError(f"Model is not loaded: {MODEL_LOAD_ERROR}")
+        results, failures = predict_items(items)
+    except Exception as e:
+        # Report every record as failed so the event source retries the batch
+        print(f"Error processing records: {e}")
+        results, failures = [], [{"itemIdentifier": identifier} for identifier, text in items]
+
+    return {"batchItemFailures": failures, "results": results}
+
 
 def lambda_handler(event, context):
+    if "Records" in event:
+        return handle_records(event["Records"])
+
     try:
-        processed_event = json.loads(event['body'])
+        if MODEL_MANAGER is None:
+            raise RuntimeError(f"Model is not loaded: {MODEL_LOAD_ERROR}")
+
+        with METRICS.time("decode"):
+            processed_event = json.loads(event["body"])
         review_id = str(uuid.uuid4())
 
-        model_manager = ModelManager()
-        if not model_manager.model:
-            model_manager.validate_setup()
-            model_manager.train()
+        # A JSON array or {"texts": [...]} is scored as one batch
+        if isinstance(processed_event, dict) and isinstance(processed_event.get("texts"), list):
+            processed_event = processed_event["texts"]
+        if isinstance(processed_event, list):
+            items = []
+            for index, item in enumerate(processed_event):
+                text = item.get("text") if isinstance(item, dict) else item
+                items.append((str(index), text))
+            results, failures = predict_items(items)
 
+            with METRICS.time("encode"):
+                body = json.dumps({"results": results, "batchItemFailures": failures})
+            response = {
+                "statusCode": 200,
+                "body": body,
+                "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"},
+            }
         # Process valid events
-        if processed_event and 'text' in processed_event:
-            text = processed_event['text']
+        elif processed_event and "text" in processed_event:
+            text = processed_event["text"]
 
             # Invoke the model
-            sentiment, confidence = model_manager.predict(text)
+            sentiments, confidences = predict_texts([text])
+            sentiment, confidence = sentiments[0], confidences[0]
 
+            with METRICS.time("encode"):
+                body = json.dumps(
+                    {"review_id": review_id, "sentiment": sentiment, "confidence": confidence, "text": text}
+                )
             response = {
-                'statusCode': 200,
-                'body': json.dumps({
-                    'review_id': review_id,
-                    'sentiment': sentiment,
-                    'confidence': confidence,
-                    'text': text
-                }),
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
+                "statusCode": 200,
+                "body": body,
+                "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"},
             }
         else:
             response = {
-                'statusCode': 400,
-                'body': json.dumps('Invalid input: No text provided for sentiment analysis'),
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                }
+                "statusCode": 400,
+                "body": json.dumps("Invalid input: No text provided for sentiment analysis"),
+                "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"},
             }
     except Exception as e:
         response = {
-            'statusCode': 500,
-            'body': json.dumps(f'Error processing request: {str(e)}'),
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            }
+            "statusCode": 500,
+            "body": json.dumps(f"Error processing request: {str(e)}"),
+            "headers": {"Content-Type": "application/json", "Access-Control-Allow-Origin": "*"},
         }
 
     return response
@@ -0,0 +1,121 @@
+import gc
+import json
+import os
+import signal
+import socket
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from ds_ticat.ServerConfig import available_cpus
+
+
+def load_server_config(path=None):
+    """
+    Returns (workers, threads) from the "workers" and "threads" keys of a JSON config file.
+    SERVER_WORKERS and SERVER_THREADS override the file, workers default to the available CPUs
+    and threads to one per worker, since scoring holds the GIL and more threads only help with slow clients.
+    """
+    config = {}
+    if path and os.path.exists(path):
+        with open(path, "r") as f:
+            config = json.load(f)
+    workers = int(os.environ.get("SERVER_WORKERS") or config.get("workers") or available_cpus())
+    threads = int(os.environ.get("SERVER_THREADS") or config.get("threads") or 1)
+    return workers, threads
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class PooledWSGIServer(WSGIServer):
+    """
+    WSGI server on an already listening socket that handles requests on a fixed-size thread pool.
+    """
+
+    def __init__(self, sock, app, threads=1):
+        super().__init__(sock.getsockname()[:2], QuietRequestHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = sock
+        self.server_name = socket.getfqdn(self.server_address[0])
+        self.server_port = self.server_address[1]
+        self.setup_environ()
+        self.set_app(app)
+        self.executor = ThreadPoolExecutor(threads) if threads > 1 else None
+
+    def process_request(self, request, client_address):
+        if self.executor is None:
+            super().process_request(request, client_address)
+        else:
+            self.executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+def serve(app, host="0.0.0.0", port=8080, workers=1, threads=1, after_fork=None):
+    """
+    Binds once and forks workers that accept on the shared socket. Everything the parent loaded
+    before calling serve, like the model, is shared copy-on-write by all workers.
+    Dead workers are restarted until the parent receives SIGTERM or SIGINT.
+    """
+    sock = socket.create_server((host, port), backlog=1024)
+    # Objects allocated so far are never collected, so the collector does not write to
+    # their shared pages and turn them into private copies in every worker
+    gc.freeze()
+
+    children = {}
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            try:
+                if after_fork is not None:
+                    after_fork()
+                PooledWSGIServer(sock, app, threads).serve_forever()
+            except Exception:
+                traceback.print_exc()
+            finally:
+                os._exit(1)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    print(f"Pre-fork server listening on {host}:{port} with {workers} workers and {threads} threads each")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+        print(f"Worker {pid} exited with status {status}, restarting")
+        # Back off if workers die right after starting, instead of forking in a tight loop
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        spawn()
+    sock.close()
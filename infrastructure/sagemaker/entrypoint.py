@@ -1,9 +1,74 @@
+import glob
+import json
+import os
+
 from sagemaker_inference import model_server
 
+from ds_ticat.InferenceModel import InferenceModel
+from ds_ticat.LatencyMetrics import METRICS, serve_metrics
+from ds_ticat.RequestProfiler import RequestProfiler
+from ds_ticat.ServerConfig import available_cpus
+
 HANDLER_SERVICE = "/opt/ml/code/sagemaker/model_handler.py:handle"
+SERVICE_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "service.config")
+METRICS_DIR = os.environ.setdefault("METRICS_DIR", "/tmp/ticat_metrics")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", 9090))
+MODEL_DIR = os.environ.get("MODEL_DIR", "/opt/ml/model")
+
+
+def start_metrics_server():
+    """
+    Serves the latency histograms of all model server workers, merged, on METRICS_PORT/metrics.
+    """
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+        os.remove(path)
+    serve_metrics(lambda: METRICS.render(METRICS.read_snapshots(METRICS_DIR)), METRICS_PORT)
+
+
+def ensure_inference_artifact(model_dir=MODEL_DIR):
+    """
+    Exports the memory-mappable inference artifact from the joblib model if the model directory has none,
+    since SageMaker mounts the model at runtime. Returns whether the artifact exists.
+    """
+    model = InferenceModel(model_dir=model_dir)
+    if os.path.exists(model.artifact_path):
+        return True
+    if not os.path.exists(model.model_path):
+        return False
+    try:
+        from ds_ticat.ModelManager import ModelManager
+
+        ModelManager(model_dir=model_dir).export_inference_artifact()
+    except Exception as e:
+        # Hashed streaming models cannot be exported and the model directory may be read-only
+        print(f"Could not export the inference artifact: {e}")
+    return os.path.exists(model.artifact_path)
+
+
+def configure_workers(shared_model):
+    """
+    Sets the model server worker count from the "workers" key of service.config. An explicit
+    SAGEMAKER_MODEL_SERVER_WORKERS wins. The model server starts its workers itself, with shared_model they share
+    one copy of the model because every worker memory-maps the same read-only artifact files, and the count defaults
+    to the available CPUs. Without it every worker unpickles its own copy, so the default is a single worker.
+    """
+    with open(SERVICE_CONFIG, "r") as f:
+        config = json.load(f)
+    workers = config.get("workers") or (available_cpus() if shared_model else 1)
+    os.environ.setdefault("SAGEMAKER_MODEL_SERVER_WORKERS", str(workers))
+    print(f"Starting model server with {os.environ['SAGEMAKER_MODEL_SERVER_WORKERS']} workers")
 
 
 def main():
+    configure_workers(ensure_inference_artifact())
+    if METRICS.enabled:
+        start_metrics_server()
+    # The model server workers inherit TICAT_PROFILE_* and profile their own requests
+    profiler = RequestProfiler.from_env()
+    if profiler.enabled:
+        os.makedirs(profiler.directory, exist_ok=True)
+        print(f"Profiling 1 in {profiler.every} requests into {profiler.directory}")
     model_server.start_model_server(handler_service=HANDLER_SERVICE)
 
 
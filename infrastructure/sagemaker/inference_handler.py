@@ -1,70 +1,179 @@
+import csv
+import io
 import json
 import logging
 import os
+import threading
+
 from sagemaker_inference import default_inference_handler
-from ds_ticat.ModelManager import ModelManager
 
-logging.basicConfig(level=logging.DEBUG)
+from ds_ticat.InferenceModel import InferenceModel
+from ds_ticat.LatencyMetrics import METRICS
+from ds_ticat.PredictionCache import PredictionCache
+from ds_ticat.RequestProfiler import RequestProfiler
+
+logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
 MODEL_ID = "sentiment_analysis_model"
 
+# Every worker process writes its latency histograms where the entrypoint's /metrics endpoint merges them
+if METRICS.enabled and os.environ.get("METRICS_DIR"):
+    METRICS.start_exporter(os.environ["METRICS_DIR"])
+
+# TICAT_PROFILE_EVERY=N profiles one in N requests of each worker into TICAT_PROFILE_DIR
+PROFILER = RequestProfiler.from_env()
+
+
 class ContainerModelInferenceHandler(default_inference_handler.DefaultInferenceHandler):
+    # Models loaded by this worker process, keyed by model directory
+    _model_registry = {}
+    _registry_lock = threading.Lock()
+    # Shared by all requests of this worker process, None if PREDICTION_CACHE_SIZE is 0
+    _prediction_cache = PredictionCache.from_env()
+
     def __init__(self):
         self.model_manager = None
 
-    def default_model_fn(self, model_dir):
-        logging.info(f"Loading model from directory: {model_dir}")
-        self.model_manager = ModelManager(
-            project_root="/opt/ml",
-            model_dir=model_dir,
-            data_dir="/opt/ml/input/data/"
-        )
-        self.model_manager.load_model()
-        logging.info("Model loaded successfully")
+    def initialize(self, model_dir):
+        """Load the model for model_dir once and cache it on the handler."""
+        self.model_manager = self.default_model_fn(model_dir)
         return self.model_manager
+
+    def default_model_fn(self, model_dir):
+        model_manager = self._model_registry.get(model_dir)
+        if model_manager is None:
+            with self._registry_lock:
+                model_manager = self._model_registry.get(model_dir)
+                if model_manager is None:
+                    logging.info("Loading model from directory: %s", model_dir)
+                    model_manager = InferenceModel(project_root="/opt/ml", model_dir=model_dir)
+                    model_manager.load_model(use_artifact=True)
+                    self._model_registry[model_dir] = model_manager
+                    logging.info("Model loaded successfully")
+        self.model_manager = model_manager
+        return model_manager
+
     def default_input_fn(self, data, content_type):
-        data_string = str(data)
-        logging.debug(f"Deserializing the input data. Content type: {content_type}")
+        """Deserialize a single text or a batch of texts.
+
+        Single: a JSON string or {"text": ...}. Batch: a JSON array of those, {"texts": [...]},
+        application/jsonlines with one of those per line, or text/csv with one text per row.
+        CSV rows are never dropped, a header row is only skipped with "text/csv; header=present".
+        Batches are returned as a list and scored together.
+        """
+        data_string = data.decode("utf-8") if isinstance(data, (bytes, bytearray)) else str(data)
+        content_type, _, parameters = (content_type or "").partition(";")
+        content_type = content_type.strip()
+        logging.debug("Deserializing the input data. Content type: %s", content_type)
+        with METRICS.time("decode"):
+            return self._decode(data_string, content_type, self._content_type_parameters(parameters))
+
+    @staticmethod
+    def _content_type_parameters(parameters):
+        pairs = (parameter.partition("=") for parameter in parameters.split(";") if parameter.strip())
+        return {name.strip().lower(): value.strip().strip('"').lower() for name, _, value in pairs}
+
+    def _decode(self, data_string, content_type, parameters):
         if content_type == "application/json":
-            logging.debug(f"Deserializing the input data {data_string}.")
+            # Lazy %s arguments, so payloads are only formatted when debug logging is enabled
+            logging.debug("Deserializing the input data %s.", data_string)
             decoded_data = json.loads(data_string)
-            logging.debug(f"Deserialized input data: {decoded_data}.")
-
-            if isinstance(decoded_data, dict) and 'text' in decoded_data:
-                return decoded_data['text']
-            elif isinstance(decoded_data, str):
-                return decoded_data
-            else:
-                raise ValueError("Input data should be a string or a dictionary with 'text' key.")
+            logging.debug("Deserialized input data: %s.", decoded_data)
+
+            if isinstance(decoded_data, dict) and "texts" in decoded_data and isinstance(decoded_data["texts"], list):
+                return [self._record_text(record) for record in decoded_data["texts"]]
+            elif isinstance(decoded_data, list):
+                return [self._record_text(record) for record in decoded_data]
+            return self._record_text(decoded_data)
+        elif content_type in ("application/jsonlines", "application/jsonl"):
+            return [self._record_text(json.loads(line)) for line in data_string.splitlines() if line.strip()]
+        elif content_type == "text/csv":
+            # One text per input line, blank lines included, so Batch Transform can join outputs to inputs
+            rows = list(csv.reader(io.StringIO(data_string)))
+            column = 0
+            if parameters.get("header") == "present" and rows:
+                header = rows.pop(0)
+                column = header.index("text") if "text" in header else 0
+            return [row[column] if column < len(row) else "" for row in rows]
         else:
             raise ValueError(f"Unsupported content type: {content_type}")
 
+    @staticmethod
+    def _record_text(record):
+        if isinstance(record, dict) and isinstance(record.get("text"), str):
+            return record["text"]
+        elif isinstance(record, str):
+            return record
+        raise ValueError(
+            "Input data should be a string or a dictionary with 'text' key, "
+            "or a list of those or a dictionary with 'texts' key for batches."
+        )
+
     def default_predict_fn(self, input_data, model_manager):
-        logging.debug(f"Predicting for input data: {input_data}")
-        label, confidence = model_manager.predict(input_data)
-        logging.debug(f"Prediction: {label}, Confidence: {confidence}")
-        return [label, confidence, MODEL_ID]
+        logging.debug("Predicting for input data: %s", input_data)
+        if isinstance(input_data, str):
+            labels, confidences = self._predict_batch(model_manager, [input_data])
+            label, confidence = labels[0], confidences[0]
+            logging.debug("Prediction: %s, Confidence: %s", label, confidence)
+            return [label, confidence, MODEL_ID]
+
+        # Batches go through one vectorized prediction and keep the input order
+        if input_data:
+            labels, confidences = self._predict_batch(model_manager, input_data)
+        else:
+            labels, confidences = [], []
+        logging.debug("Predicted batch of %d texts", len(input_data))
+        return {"labels": labels, "confidences": confidences, "model_id": MODEL_ID}
+
+    def _predict_batch(self, model_manager, texts):
+        with METRICS.time("predict"):
+            if self._prediction_cache is not None:
+                return self._prediction_cache.predict_batch(model_manager, texts)
+            return model_manager.predict_batch(texts)
 
     def default_output_fn(self, prediction_output, accept):
-        logging.debug(f"Serializing the generated output {prediction_output}")
+        logging.debug("Serializing the generated output %s", prediction_output)
+        accept = (accept or "application/json").split(";")[0].strip()
+        with METRICS.time("encode"):
+            return self._encode(prediction_output, accept)
+
+    @staticmethod
+    def _encode(prediction_output, accept):
+        if isinstance(prediction_output, dict):
+            records = [
+                {"label": str(label), "confidence": float(confidence), "model_id": prediction_output["model_id"]}
+                for label, confidence in zip(prediction_output["labels"], prediction_output["confidences"])
+            ]
+        else:
+            records = None
+
         if accept == "application/json":
+            if records is not None:
+                return json.dumps(records)
             serialized_prediction = {
                 "label": prediction_output[0],
                 "confidence": float(prediction_output[1]),
                 "model_id": prediction_output[2],
             }
             return json.dumps(serialized_prediction)
+        elif accept in ("application/jsonlines", "application/jsonl") and records is not None:
+            return "".join(json.dumps(record) + "\n" for record in records)
+        elif accept == "text/csv" and records is not None:
+            output = io.StringIO()
+            writer = csv.writer(output, lineterminator="\n")
+            writer.writerows([record["label"], record["confidence"], record["model_id"]] for record in records)
+            return output.getvalue()
         else:
             raise ValueError(f"Unsupported accept type: {accept}")
 
     def handle(self, data, context):
-        """Handle the request."""
+        """Handle the request. The model server goes through model_handler.HandlerService instead."""
         model_name = context.model_name
-        logging.info(f"Handling request with model: {model_name}")
+        logging.info("Handling request with model: %s", model_name)
 
-        # The rest of the method remains the same
-        model = self.default_model_fn(context.model_dir)
+        # The model is loaded once per worker, requests only look it up
+        model = self.model_manager
+        if model is None or model.model_dir != context.model_dir:
+            model = self.default_model_fn(context.model_dir)
         input_data = self.default_input_fn(data, context.request_content_type)
         prediction = self.default_predict_fn(input_data, model)
-        result = self.default_output_fn(prediction, context.accept)
-
-        return result
+        return self.default_output_fn(prediction, context.accept)
@@ -1,4 +1,4 @@
-from inference_handler import ContainerModelInferenceHandler
+from inference_handler import METRICS, PROFILER, ContainerModelInferenceHandler
 from sagemaker_inference import transformer
 from sagemaker_inference.default_handler_service import DefaultHandlerService
 
@@ -9,3 +9,9 @@ class HandlerService(DefaultHandlerService):
     def __init__(self):
         tr = transformer.Transformer(default_inference_handler=ContainerModelInferenceHandler())
         super(HandlerService, self).__init__(transformer=tr)
+
+    def handle(self, data, context):
+        # The model server calls this for every request and the Transformer then runs the
+        # handler's input, predict and output functions, so the whole request is profiled and timed here
+        with PROFILER.profile(), METRICS.time("request"):
+            return super(HandlerService, self).handle(data, context)
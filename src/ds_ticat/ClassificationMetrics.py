@@ -0,0 +1,59 @@
+import numpy as np
+
+
+class ClassificationMetrics:
+    """
+    Derives accuracy, weighted precision/recall/F1 and log loss from one confusion matrix per split.
+    """
+
+    def __init__(self, classes, epsilon=1e-15):
+        self.classes = np.asarray(classes)
+        self.epsilon = epsilon
+
+    def encode(self, labels):
+        """
+        Encodes labels as column indices into the sorted classes, so a split only has to be encoded once.
+        """
+        labels = np.asarray(labels)
+        indices = np.searchsorted(self.classes, labels)
+        valid = indices < len(self.classes)
+        valid[valid] = self.classes[indices[valid]] == labels[valid]
+        if not valid.all():
+            raise ValueError(f"Unknown labels: {sorted(set(labels[~valid].tolist()))}")
+        return indices
+
+    def confusion_matrix(self, y_true, y_pred):
+        """
+        Builds the confusion matrix of encoded true and predicted labels with a single bincount.
+        """
+        n_classes = len(self.classes)
+        counts = np.bincount(y_true * n_classes + y_pred, minlength=n_classes * n_classes)
+        return counts.reshape(n_classes, n_classes)
+
+    def compute(self, y_true, probabilities, prefix):
+        """
+        Computes all metrics for encoded true labels and the predicted class probabilities.
+        """
+        y_pred = np.argmax(probabilities, axis=1)
+        matrix = self.confusion_matrix(y_true, y_pred)
+        true_positives = np.diag(matrix).astype(np.float64)
+        support = matrix.sum(axis=1)
+        predicted = matrix.sum(axis=0)
+
+        # Classes without predictions or support count as zero, like zero_division=0
+        precision = np.divide(true_positives, predicted, out=np.zeros_like(true_positives), where=predicted > 0)
+        recall = np.divide(true_positives, support, out=np.zeros_like(true_positives), where=support > 0)
+        f1_denominator = support + predicted
+        f1 = np.divide(2 * true_positives, f1_denominator, out=np.zeros_like(true_positives), where=f1_denominator > 0)
+        weights = support / support.sum()
+
+        clipped = np.clip(probabilities, self.epsilon, 1 - self.epsilon)
+        true_probabilities = clipped[np.arange(len(y_true)), y_true] / clipped.sum(axis=1)
+
+        return {
+            f"{prefix}_accuracy": float(true_positives.sum() / len(y_true)),
+            f"{prefix}_loss": float(-np.mean(np.log(true_probabilities))),
+            f"{prefix}_precision": float(precision @ weights),
+            f"{prefix}_recall": float(recall @ weights),
+            f"{prefix}_f1": float(f1 @ weights),
+        }
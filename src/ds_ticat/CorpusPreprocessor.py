@@ -0,0 +1,179 @@
+"""
+Preprocesses a JSONL ticket corpus across cores and writes the result as JSONL in the input order.
+
+    python -m ds_ticat.CorpusPreprocessor data/tickets.jsonl data/tickets.preprocessed.jsonl \
+        --workers 8 --chunk-size 1000 --greetings-file configs/greetings.txt
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .Greetingfilter import GreetingProcessor
+from .GreetingMatcher import GreetingMatcher
+from .TextPreProcessor import TextPreProcessor
+
+# Preprocessor and greeting matcher of each worker, built once by the pool initializer instead of per chunk
+_worker_data = {}
+
+
+def _init_worker(settings):
+    _worker_data.update(settings)
+    _worker_data["preprocessor"] = TextPreProcessor(settings["max_input_chars"])
+    _worker_data["matcher"] = GreetingMatcher(settings["greetings"]) if settings["greetings"] else None
+
+
+def _process_chunk(first_line, lines):
+    """
+    Parses, preprocesses and serializes one chunk of JSONL lines, so the parent only reads and writes.
+    """
+    preprocessor = _worker_data["preprocessor"]
+    matcher = _worker_data["matcher"]
+    text_field = _worker_data["text_field"]
+    output_field = _worker_data["output_field"]
+
+    output = []
+    for line_number, line in enumerate(lines, first_line):
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from None
+        text = record.get(text_field)
+        if isinstance(text, str):
+            text = preprocessor.process_text(text)
+            if matcher is not None:
+                text = matcher.cut(text)
+            record[output_field] = text
+        output.append(json.dumps(record, ensure_ascii=False) + "\n")
+    return output
+
+
+class CorpusPreprocessor:
+    """
+    Preprocesses the text field of JSONL records with TextPreProcessor and, given a greetings file,
+    cuts them before their earliest greeting like GreetingProcessor.
+    Lines are read in chunks of chunk_size and handed to a process pool with at most max_pending chunks
+    in flight, so memory stays bounded by chunk_size * max_pending records whatever the corpus size.
+    """
+
+    def __init__(
+        self,
+        workers=None,
+        chunk_size=1000,
+        max_pending=None,
+        text_field="text",
+        output_field=None,
+        greetings_file=None,
+        max_input_chars=1_000_000,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # Two chunks per worker keep every worker busy while the parent writes finished chunks
+        self.max_pending = max_pending or 2 * self.workers
+        self.text_field = text_field
+        self.output_field = output_field or text_field
+        self.greetings_file = greetings_file
+        self.max_input_chars = max_input_chars
+
+    def _settings(self):
+        greetings = []
+        if self.greetings_file:
+            greetings = GreetingProcessor().load_and_process_greetings_sequences(self.greetings_file)
+            if greetings is None:
+                raise FileNotFoundError(f"Could not load greetings from {self.greetings_file}")
+        return {
+            "greetings": greetings,
+            "text_field": self.text_field,
+            "output_field": self.output_field,
+            "max_input_chars": self.max_input_chars,
+        }
+
+    def _chunks(self, lines):
+        chunk = []
+        first_line = 1
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            if not chunk:
+                first_line = line_number
+            chunk.append(line)
+            if len(chunk) >= self.chunk_size:
+                yield first_line, chunk
+                chunk = []
+        if chunk:
+            yield first_line, chunk
+
+    def process_lines(self, lines):
+        """
+        Yields the preprocessed JSONL lines for an iterable of JSONL lines, in the input order.
+        Blank lines are skipped.
+        """
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self._settings(),),
+        ) as executor:
+            pending = deque()
+            for first_line, chunk in self._chunks(lines):
+                # Waiting for the oldest chunk both keeps the order and stops reading ahead of the workers
+                if len(pending) >= self.max_pending:
+                    yield from pending.popleft().result()
+                pending.append(executor.submit(_process_chunk, first_line, chunk))
+            while pending:
+                yield from pending.popleft().result()
+
+    def process_file(self, input_path, output_path):
+        """
+        Preprocesses a JSONL file into output_path and returns the number of records written.
+        The output is written to a temporary file first, so an interrupted run leaves no partial output.
+        """
+        temp_path = f"{output_path}.tmp"
+        count = 0
+        try:
+            with open(input_path, "r", encoding="utf-8") as lines, open(temp_path, "w", encoding="utf-8") as output:
+                for line in self.process_lines(lines):
+                    output.write(line)
+                    count += 1
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL file with one ticket per line")
+    parser.add_argument("output", help="JSONL file for the preprocessed tickets")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the CPU count")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Lines per task")
+    parser.add_argument(
+        "--max-pending", type=int, default=None, help="Chunks in flight at once, defaults to twice the workers"
+    )
+    parser.add_argument("--text-field", default="text")
+    parser.add_argument("--output-field", default=None, help="Defaults to replacing the text field")
+    parser.add_argument("--greetings-file", default=None, help="Cut each text before its earliest greeting")
+    parser.add_argument("--max-input-chars", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    preprocessor = CorpusPreprocessor(
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        max_pending=args.max_pending,
+        text_field=args.text_field,
+        output_field=args.output_field,
+        greetings_file=args.greetings_file,
+        max_input_chars=args.max_input_chars,
+    )
+    start = time.perf_counter()
+    count = preprocessor.process_file(args.input, args.output)
+    elapsed = time.perf_counter() - start
+    print(f"Preprocessed {count} records with {preprocessor.workers} workers in {elapsed:.1f}s into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
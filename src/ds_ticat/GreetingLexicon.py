@@ -0,0 +1,111 @@
+import os
+import threading
+
+from .Greetingfilter import GreetingProcessor
+from .GreetingMatcher import GreetingMatcher
+
+
+class GreetingLexicon:
+    """
+    Greeting matcher for a greetings file, parsed and compiled once per version of the file.
+    With key_name the greetings are the list under that key of a YAML file, otherwise one per line.
+    A daemon thread polls the file and swaps in a new matcher when it changes, so cut never does
+    file I/O or compilation on the request path.
+    """
+
+    # Compiled matchers keyed by (path, key_name, mtime), shared by all lexicons of the process
+    _matchers = {}
+    _lock = threading.Lock()
+    # Shared lexicons by path and key_name, with their own lock since creating one loads the file under _lock
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, greetings_file, poll_interval=30, processor=None, key_name=None):
+        self.greetings_file = os.path.abspath(greetings_file)
+        self.key_name = key_name
+        self.poll_interval = poll_interval
+        self.processor = processor if processor else GreetingProcessor()
+        self.matcher = GreetingMatcher([])
+        self.version = None
+        self._thread = None
+        self._pid = None
+        self._stopped = threading.Event()
+        self.reload()
+
+    @classmethod
+    def get(cls, greetings_file, poll_interval=30, key_name=None):
+        """
+        Returns the shared, polling lexicon for a greetings file, creating it on first use.
+        """
+        path = os.path.abspath(greetings_file)
+        with cls._instances_lock:
+            lexicon = cls._instances.get((path, key_name))
+            if lexicon is None:
+                lexicon = cls._instances[(path, key_name)] = cls(path, poll_interval, key_name=key_name)
+            # Threads do not survive a fork, so a forked worker starts its own poller
+            if lexicon._pid != os.getpid():
+                lexicon.start()
+        return lexicon
+
+    def reload(self):
+        """
+        Swaps in the matcher for the current version of the file. Returns True if the matcher changed.
+        Errors keep the current matcher, so a file that is missing or half written is picked up on a later poll.
+        """
+        try:
+            version = (self.greetings_file, self.key_name, os.stat(self.greetings_file).st_mtime_ns)
+        except OSError as e:
+            print(f"Error: could not read '{self.greetings_file}': {e}")
+            return False
+        if version == self.version:
+            return False
+
+        with self._lock:
+            matcher = self._matchers.get(version)
+        if matcher is None:
+            greetings_sequences = self.processor.load_and_process_greetings_sequences(
+                self.greetings_file, key_name=self.key_name
+            )
+            if greetings_sequences is None:
+                return False
+            matcher = GreetingMatcher(greetings_sequences)
+            with self._lock:
+                for key in [key for key in self._matchers if key[:2] == version[:2]]:
+                    del self._matchers[key]
+                self._matchers[version] = matcher
+
+        # A single attribute assignment, requests see either the old or the new matcher
+        self.matcher = matcher
+        self.version = version
+        return True
+
+    def start(self):
+        """
+        Starts the daemon thread that reloads the file every poll_interval seconds.
+        """
+        self._stopped.clear()
+        self._pid = os.getpid()
+
+        def poll():
+            while not self._stopped.wait(self.poll_interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"An error occurred while reloading {self.greetings_file}: {e}")
+
+        self._thread = threading.Thread(target=poll, name="greeting-lexicon", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._pid = None
+
+    def cut(self, text):
+        return self.matcher.cut(text)
+
+    def cut_batch(self, texts):
+        return self.matcher.cut_batch(texts)
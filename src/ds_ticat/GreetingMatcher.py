@@ -0,0 +1,92 @@
+from collections import deque
+from operator import length_hint
+
+
+class GreetingMatcher:
+    """
+    Finds the earliest greeting in a text with an Aho-Corasick automaton compiled once from the greeting list.
+    """
+
+    def __init__(self, greetings):
+        # Empty greetings would match everywhere, duplicates add nothing
+        self.greetings = list(dict.fromkeys(greeting for greeting in greetings if greeting))
+        self.max_length = max((len(greeting) for greeting in self.greetings), default=0)
+        self._transitions, self._longest = self._compile(self.greetings)
+        # Bound lookups of every state, which saves an indexing and an attribute lookup per character
+        self._steps = [transitions.get for transitions in self._transitions]
+
+    @staticmethod
+    def _compile(greetings):
+        # Trie of all greetings, longest[state] is the length of the greeting ending in that state
+        transitions = [{}]
+        longest = [0]
+        for greeting in greetings:
+            state = 0
+            for char in greeting:
+                next_state = transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(transitions)
+                    transitions[state][char] = next_state
+                    transitions.append({})
+                    longest.append(0)
+                state = next_state
+            longest[state] = max(longest[state], len(greeting))
+
+        # Breadth-first, every state inherits the missing transitions of its failure state, which turns the trie
+        # into a full DFA, and the longest greeting ending there, which can be a suffix of its own path
+        failure = [0] * len(transitions)
+        queue = deque()
+        for state in transitions[0].values():
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            longest[state] = max(longest[state], longest[failure[state]])
+            for char, next_state in list(transitions[state].items()):
+                failure[next_state] = transitions[failure[state]].get(char, 0) if state else 0
+                queue.append(next_state)
+            if state:
+                for char, next_state in transitions[failure[state]].items():
+                    transitions[state].setdefault(char, next_state)
+        return transitions, longest
+
+    def find(self, text):
+        """
+        Returns (start, end) of the earliest greeting in the text, or None if there is none.
+        """
+        steps = self._steps
+        longest = self._longest
+        state = 0
+        # Plain iteration is the hot loop, the position is only needed once a greeting ends
+        characters = iter(text)
+        for char in characters:
+            state = steps[state](char, 0)
+            if longest[state]:
+                break
+        else:
+            return None
+        best_end = len(text) - length_hint(characters)
+        best_start = best_end - longest[state]
+
+        # A longer greeting ending later can still start earlier, but only within the next max_length characters
+        limit = best_start + self.max_length
+        for end, char in enumerate(characters, best_end + 1):
+            if end > limit:
+                break
+            state = steps[state](char, 0)
+            if longest[state] and end - longest[state] < best_start:
+                best_start = end - longest[state]
+                best_end = end
+        return best_start, best_end
+
+    def cut(self, text):
+        """
+        Cuts the text before its earliest greeting, texts without a greeting are returned unchanged.
+        """
+        match = self.find(text)
+        if match is None:
+            return text
+        return text[: match[0]].strip()
+
+    def cut_batch(self, texts):
+        cut = self.cut
+        return [cut(text) for text in texts]
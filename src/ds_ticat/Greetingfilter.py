@@ -1,24 +1,37 @@
-from TextPreProcessor import TextPreProcessor
+from functools import lru_cache
+
+from .GreetingMatcher import GreetingMatcher
+from .TextPreProcessor import TextPreProcessor
+
+
+@lru_cache(maxsize=8)
+def _compile_greetings(greetings_sequences):
+    return GreetingMatcher(greetings_sequences)
 
 
 class GreetingProcessor:
-    def load_and_process_greetings_sequences(self, greetings_file):
+    def load_and_process_greetings_sequences(self, greetings_file, key_name=None):
         """
-        Load and clean greeting sequences from a file.
+        Load and clean greeting sequences from a file, one greeting per line,
+        or from the list under key_name if the file is YAML.
         """
         try:
             # Load list of strings from file
             with open(greetings_file, "r", encoding="utf-8") as file:
-                lines = file.readlines()
+                if key_name:
+                    import yaml
+
+                    lines = [str(greeting) for greeting in yaml.safe_load(file)[key_name] or []]
+                else:
+                    lines = file.readlines()
 
             # Clean lines by stripping whitespace and filtering out empty lines
             cleaned_lines = [line.strip() for line in lines if line.strip()]
             print(f"{greetings_file} loaded successfully.")
 
-            # Further process the cleaned lines using process_text
-            if cleaned_lines:
-                processed_greetings_sequences = [line.replace('"', "").replace(",", "") for line in cleaned_lines]
-                processed_greetings_sequences = TextPreProcessor.process_text(processed_greetings_sequences)
+            # Further process the cleaned lines the same way as ticket texts
+            processed_greetings_sequences = [line.replace('"', "").replace(",", "") for line in cleaned_lines]
+            processed_greetings_sequences = TextPreProcessor().process_batch(processed_greetings_sequences)
 
             return processed_greetings_sequences
 
@@ -27,15 +40,31 @@ class GreetingProcessor:
         except Exception as e:
             print(f"An error occurred while processing greetings_sequences: {e}")
 
+    def get_greetings_matcher(self, greetings_sequences):
+        """
+        Returns a GreetingMatcher for the greetings, compiled once per distinct greeting list.
+        """
+        if isinstance(greetings_sequences, GreetingMatcher):
+            return greetings_sequences
+        return _compile_greetings(tuple(greetings_sequences))
+
     def cut_after_greetings_sequences(self, text, greetings_sequences):
         """
-        Cuts the text after any greeting found in the text.
+        Cuts the text before the earliest greeting found in the text.
+        greetings_sequences can be a list of greetings or a prebuilt GreetingMatcher.
         """
         try:
-            for greeting in greetings_sequences:
-                if greeting in text:
-                    return text.split(greeting)[0].strip()
-            return text
+            return self.get_greetings_matcher(greetings_sequences).cut(text)
         except Exception as e:
             print(f"An error occurred while cutting after greetings sequences: {e}")
             return text
+
+    def cut_after_greetings_sequences_batch(self, texts, greetings_sequences):
+        """
+        Cuts a list of texts before their earliest greeting, returning them in the same order.
+        """
+        try:
+            return self.get_greetings_matcher(greetings_sequences).cut_batch(texts)
+        except Exception as e:
+            print(f"An error occurred while cutting after greetings sequences: {e}")
+            return list(texts)
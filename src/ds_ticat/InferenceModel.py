@@ -0,0 +1,84 @@
+import os
+
+import numpy as np
+
+from .LatencyMetrics import METRICS
+from .LinearTextScorer import LinearTextScorer
+
+
+class InferenceModel:
+    """
+    Loads a trained model and serves predictions. Only NumPy is imported up front, joblib and
+    scikit-learn are imported when a joblib Pipeline has to be loaded instead of the inference artifact.
+    """
+
+    def __init__(
+        self,
+        project_root="./",
+        model_dir=None,
+        model_filename="sentiment_model.joblib",
+        artifact_filename="sentiment_model.artifact",
+    ):
+        self.project_root = project_root
+        self.model_dir = model_dir if model_dir else os.path.join(project_root, "models")
+        self.model_path = os.path.join(self.model_dir, model_filename)
+        self.artifact_path = os.path.join(self.model_dir, artifact_filename)
+        self.model = None
+        self.model_version = None
+
+    def predict(self, text):
+        predictions, probabilities = self.predict_batch([text])
+        return predictions[0], probabilities[0]
+
+    def predict_batch(self, texts):
+        """
+        Predicts labels and confidences for a batch of texts with a single vectorization pass.
+        """
+        if self.model is None:
+            self.load_model()
+
+        # Vectorization and scoring are timed separately for the serving latency metrics
+        if isinstance(self.model, LinearTextScorer):
+            transform, predict_proba = self.model.transform, self.model.predict_proba_transformed
+        else:
+            transform, predict_proba = self.model[:-1].transform, self.model[-1].predict_proba
+        with METRICS.time("vectorize"):
+            features = transform(texts)
+        with METRICS.time("predict_proba"):
+            probabilities = predict_proba(features)
+        best = np.argmax(probabilities, axis=1)
+        predictions = self.model.classes_[best]
+        confidences = probabilities[np.arange(len(best)), best]
+        return predictions, confidences
+
+    def load_model(self, use_artifact=False):
+        if use_artifact and os.path.exists(self.artifact_path):
+            # Memory-mapped arrays make the load independent of the model size
+            self.model = LinearTextScorer.load(self.artifact_path, mmap_mode="r")
+            self._update_model_version(self.artifact_path)
+            print(f"Inference artifact loaded from {self.artifact_path}")
+        elif os.path.exists(self.model_path):
+            import joblib
+
+            self.model = joblib.load(self.model_path)
+            self._update_model_version(self.model_path)
+            print(f"Model loaded from {self.model_path}")
+        else:
+            raise FileNotFoundError(f"No model found at {self.model_path}. Please train the model first.")
+
+    def _update_model_version(self, path):
+        """
+        Derives model_version from the saved file, so every save or swap of the model changes it.
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, "manifest.json")
+        stat = os.stat(path)
+        self.model_version = f"{stat.st_ino}-{stat.st_size}-{stat.st_mtime_ns}"
+
+    def get_project_info(self):
+        return {
+            "project_root": self.project_root,
+            "model_directory": self.model_dir,
+            "model_path": self.model_path,
+            "artifact_path": self.artifact_path,
+        }
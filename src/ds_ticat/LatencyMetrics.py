@@ -0,0 +1,212 @@
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Upper bounds in seconds from 10us to about 50s, each 1.5 times the previous one,
+# which keeps interpolated quantiles within the width of one bucket
+BUCKETS = tuple(0.00001 * 1.5**i for i in range(39))
+QUANTILES = (0.5, 0.95, 0.99)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_NULL_TIMER = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+
+
+class LatencyMetrics:
+    """
+    Aggregates per-stage latencies in-process into fixed-bucket histograms and renders them for Prometheus.
+    When disabled, time() returns a shared no-op context manager and nothing is recorded.
+    """
+
+    def __init__(self, enabled=True, buckets=BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(buckets)
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def time(self, stage):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def observe(self, stage, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = {"count": 0, "sum": 0.0, "buckets": [0] * (len(self.buckets) + 1)}
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            histogram["buckets"][index] += 1
+
+    def snapshot(self):
+        """
+        Returns a copy of all histograms, with per-bucket (not cumulative) counts and +Inf as the last bucket.
+        """
+        with self._lock:
+            return {
+                stage: {"count": h["count"], "sum": h["sum"], "buckets": list(h["buckets"])}
+                for stage, h in self._histograms.items()
+            }
+
+    @staticmethod
+    def merge(snapshots):
+        merged = {}
+        for snapshot in snapshots:
+            for stage, histogram in snapshot.items():
+                target = merged.setdefault(stage, {"count": 0, "sum": 0.0, "buckets": [0] * len(histogram["buckets"])})
+                target["count"] += histogram["count"]
+                target["sum"] += histogram["sum"]
+                target["buckets"] = [a + b for a, b in zip(target["buckets"], histogram["buckets"])]
+        return merged
+
+    def quantile(self, histogram, q):
+        """
+        Estimates a quantile by linear interpolation inside its bucket, like Prometheus histogram_quantile.
+        """
+        if histogram["count"] == 0:
+            return 0.0
+        rank = q * histogram["count"]
+        cumulative = 0
+        for index, count in enumerate(histogram["buckets"]):
+            if count and cumulative + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def summary(self, snapshot=None):
+        """
+        Returns count, mean and the p50/p95/p99 estimates per stage.
+        """
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        return {
+            stage: {
+                "count": histogram["count"],
+                "mean": histogram["sum"] / histogram["count"] if histogram["count"] else 0.0,
+                **{f"p{round(q * 100)}": self.quantile(histogram, q) for q in QUANTILES},
+            }
+            for stage, histogram in snapshot.items()
+        }
+
+    def render(self, snapshot=None):
+        """
+        Renders the histograms and their quantile estimates in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot() if snapshot is None else snapshot
+        lines = [
+            "# HELP ticat_stage_latency_seconds Latency of each request processing stage.",
+            "# TYPE ticat_stage_latency_seconds histogram",
+        ]
+        for stage, histogram in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram["buckets"]):
+                cumulative += count
+                lines.append(f'ticat_stage_latency_seconds_bucket{{stage="{stage}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'ticat_stage_latency_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'ticat_stage_latency_seconds_sum{{stage="{stage}"}} {histogram["sum"]:.9g}')
+            lines.append(f'ticat_stage_latency_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+
+        lines += [
+            "# HELP ticat_stage_latency_quantile_seconds Quantiles estimated from ticat_stage_latency_seconds.",
+            "# TYPE ticat_stage_latency_quantile_seconds gauge",
+        ]
+        for stage, histogram in sorted(snapshot.items()):
+            for q in QUANTILES:
+                value = self.quantile(histogram, q)
+                lines.append(f'ticat_stage_latency_quantile_seconds{{stage="{stage}",quantile="{q}"}} {value:.9g}')
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, directory):
+        """
+        Writes this process's histograms to directory/<pid>.json, replacing the previous snapshot atomically.
+        """
+        path = os.path.join(directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, path)
+
+    def read_snapshots(self, directory):
+        """
+        Merges the snapshots written by all worker processes into directory.
+        """
+        snapshots = []
+        for name in os.listdir(directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(directory, name), "r") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return self.merge(snapshots)
+
+    def start_exporter(self, directory, interval=5):
+        """
+        Starts a daemon thread that writes this process's snapshot to directory every interval seconds,
+        for servers whose workers are separate processes behind one metrics endpoint.
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        def export():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.write_snapshot(directory)
+                except OSError as e:
+                    print(f"Failed to write metrics snapshot: {e}")
+
+        thread = threading.Thread(target=export, name="metrics-exporter", daemon=True)
+        thread.start()
+        return thread
+
+
+def serve_metrics(render, port, host="0.0.0.0"):
+    """
+    Serves render() on GET /metrics from a daemon thread and returns the server.
+    """
+    # Imported here so request handlers that only record metrics do not pay for http.server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            data = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+# Process-wide registry, TICAT_METRICS=0 turns all timers into no-ops
+METRICS = LatencyMetrics(enabled=os.environ.get("TICAT_METRICS", "1") != "0")
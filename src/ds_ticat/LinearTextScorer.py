@@ -0,0 +1,222 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+ARRAY_NAMES = ("terms", "idf", "scale", "coef", "intercept")
+
+
+class LinearTextScorer:
+    """
+    Scores texts with an exported TF-IDF + scaler + linear classifier using plain NumPy.
+    """
+
+    def __init__(self, terms, idf, scale, coef, intercept, classes, token_pattern=r"(?u)\b\w\w+\b", lowercase=True):
+        # terms is sorted and column i of idf, scale and coef belongs to terms[i], so a
+        # binary search over terms is the vocabulary lookup and nothing is rebuilt at load time
+        self.terms = terms
+        self.idf = idf
+        self.scale = scale
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = classes
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self._find_tokens = re.compile(token_pattern).findall
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        """
+        Extracts the scoring parameters from a fitted tfidf/scaler/clf Pipeline.
+        """
+        if "tfidf" not in pipeline.named_steps:
+            raise ValueError("Only pipelines with a TF-IDF vocabulary can be exported.")
+        tfidf = pipeline.named_steps["tfidf"]
+        scaler = pipeline.named_steps["scaler"]
+        clf = pipeline.named_steps["clf"]
+
+        unsupported = (
+            tfidf.analyzer != "word"
+            or tfidf.ngram_range != (1, 1)
+            or tfidf.strip_accents is not None
+            or tfidf.preprocessor is not None
+            or tfidf.tokenizer is not None
+            or tfidf.binary
+            or tfidf.norm != "l2"
+            or not tfidf.use_idf
+            or tfidf.sublinear_tf
+        )
+        if unsupported:
+            raise ValueError("Only word unigram TF-IDF with l2 norm and idf weighting can be exported.")
+        if scaler.with_mean:
+            raise ValueError("Only scalers fitted with with_mean=False can be exported.")
+
+        terms = sorted(tfidf.vocabulary_)
+        columns = np.array([tfidf.vocabulary_[term] for term in terms], dtype=np.intp)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(len(terms))
+        return cls(
+            terms=np.array(terms, dtype=str),
+            idf=np.asarray(tfidf.idf_, dtype=np.float64)[columns],
+            scale=np.asarray(scale, dtype=np.float64)[columns],
+            coef=np.ascontiguousarray(np.asarray(clf.coef_, dtype=np.float64)[:, columns]),
+            intercept=np.asarray(clf.intercept_, dtype=np.float64),
+            classes=np.asarray(clf.classes_),
+            token_pattern=tfidf.token_pattern,
+            lowercase=tfidf.lowercase,
+        )
+
+    def save(self, path):
+        """
+        Writes the scorer to a new directory of uncompressed .npy arrays plus a JSON manifest next to path,
+        then points the path symlink at it with a single os.replace, so readers never see a partial artifact.
+        The version replaced here stays for readers still loading it and is removed by the next save.
+        """
+        remove_stale_versions(path)
+        parent, name = os.path.split(os.path.abspath(path))
+        version_path = tempfile.mkdtemp(dir=parent, prefix=f"{name}.")
+        for array_name in ARRAY_NAMES:
+            np.save(os.path.join(version_path, f"{array_name}.npy"), np.ascontiguousarray(getattr(self, array_name)))
+        manifest = {
+            "format_version": FORMAT_VERSION,
+            "classes": [str(label) for label in self.classes_],
+            "token_pattern": self.token_pattern,
+            "lowercase": self.lowercase,
+        }
+        with open(os.path.join(version_path, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        # mkdtemp creates the directory private to the owner, the serving processes only need to read it
+        os.chmod(version_path, 0o755)
+
+        # An artifact written as a plain directory by an earlier release is moved aside once,
+        # os.replace cannot swap a symlink over a directory
+        if os.path.isdir(path) and not os.path.islink(path):
+            os.rename(path, tempfile.mkdtemp(dir=parent, prefix=f"{name}."))
+
+        link_path = f"{version_path}.link"
+        os.symlink(os.path.basename(version_path), link_path)
+        os.replace(link_path, path)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """
+        Loads a scorer written by save. With mmap_mode the arrays are memory-mapped instead of read,
+        so loading is independent of the model size and processes on one host share the pages.
+        """
+        # Resolve the symlink once, so every file is read from the same version even if a save switches it
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "manifest.json"), "r") as f:
+            manifest = json.load(f)
+        if manifest["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported artifact format version: {manifest['format_version']}")
+
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(
+            classes=np.array(manifest["classes"]),
+            token_pattern=manifest["token_pattern"],
+            lowercase=manifest["lowercase"],
+            **arrays,
+        )
+
+    def transform(self, texts):
+        """
+        Vectorizes a batch of texts into the scaled, l2-normalized TF-IDF entries of its known terms,
+        returned as (rows, columns, values, n_samples) like the nonzeros of a sparse matrix.
+        """
+        rows = []
+        tokens = []
+        for row, text in enumerate(texts):
+            if self.lowercase:
+                text = text.lower()
+            found = self._find_tokens(text)
+            rows.extend([row] * len(found))
+            tokens.extend(found)
+
+        n_samples = len(texts)
+        if not tokens:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0), n_samples
+
+        rows = np.array(rows, dtype=np.int64)
+        tokens = np.array(tokens, dtype=str)
+        n_features = len(self.terms)
+        columns = np.minimum(np.searchsorted(self.terms, tokens), n_features - 1)
+        known = self.terms[columns] == tokens
+
+        # One entry per (row, term) pair with its term count, like a CSR count matrix
+        keys, counts = np.unique(rows[known] * n_features + columns[known], return_counts=True)
+        rows = keys // n_features
+        columns = keys % n_features
+        values = counts * self.idf[columns]
+
+        norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n_samples))
+        values = values / norms[rows] / self.scale[columns]
+        return rows, columns, values, n_samples
+
+    def decision_function_transformed(self, features):
+        """
+        Computes the linear decision values of transformed texts.
+        """
+        rows, columns, values, n_samples = features
+        scores = np.zeros((n_samples, self.coef.shape[0]))
+        for output in range(scores.shape[1]):
+            scores[:, output] = np.bincount(rows, weights=values * self.coef[output, columns], minlength=n_samples)
+        scores += self.intercept
+        return scores
+
+    def decision_function(self, texts):
+        """
+        Computes the linear decision values for a batch of texts.
+        """
+        return self.decision_function_transformed(self.transform(texts))
+
+    def predict_proba_transformed(self, features):
+        """
+        Computes class probabilities of transformed texts the same way as SGDClassifier with log loss.
+        """
+        scores = self.decision_function_transformed(features)
+        probabilities = 0.5 * (1.0 + np.tanh(0.5 * scores))
+        if probabilities.shape[1] == 1:
+            return np.hstack([1.0 - probabilities, probabilities])
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, texts):
+        """
+        Computes class probabilities for a batch of texts.
+        """
+        return self.predict_proba_transformed(self.transform(texts))
+
+    def predict(self, texts):
+        """
+        Predicts the most likely class for a batch of texts.
+        """
+        return self.classes_[np.argmax(self.predict_proba(texts), axis=1)]
+
+
+def remove_stale_versions(path):
+    """
+    Removes the artifact versions and leftovers of crashed saves next to path that path does not point to.
+    """
+    parent, name = os.path.split(os.path.abspath(path))
+    current = os.path.realpath(path) if os.path.islink(path) else None
+    for entry in os.scandir(parent):
+        if not entry.name.startswith(f"{name}.") or entry.path == current:
+            continue
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+
+
+def remove_artifact(path):
+    """
+    Removes the artifact at path together with every version directory it may point to.
+    """
+    if os.path.islink(path):
+        os.remove(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+    remove_stale_versions(path)
@@ -0,0 +1,84 @@
+import asyncio
+
+
+class MicroBatcher:
+    """
+    Groups concurrent single-text predictions into micro-batches scored with one predict_batch call.
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=5, executor=None):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        """
+        Starts the background task that collects and scores batches on the running event loop.
+        """
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stops the background task, requests still waiting for a batch are cancelled.
+        """
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def predict(self, text):
+        """
+        Queues one text and waits for its (label, confidence) from the batch it ends up in.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    async def _collect_batch(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            # Callers that gave up while waiting are dropped before scoring
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            try:
+                # Score in the executor so the event loop keeps accepting requests for the next batch
+                labels, confidences = await loop.run_in_executor(
+                    self.executor, self.predict_batch, [text for text, future in batch]
+                )
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), label, confidence in zip(batch, labels, confidences):
+                if not future.done():
+                    future.set_result((label, confidence))
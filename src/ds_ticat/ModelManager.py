@@ -1,20 +1,84 @@
 import json
 import os
-import random
-import warnings
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
 import joblib
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
 from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import ParameterGrid, StratifiedKFold, train_test_split
 from sklearn.pipeline import Pipeline
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, log_loss
-from sklearn.exceptions import UndefinedMetricWarning
 from sklearn.preprocessing import StandardScaler
 
+from .ClassificationMetrics import ClassificationMetrics
+from .InferenceModel import InferenceModel
+from .LinearTextScorer import LinearTextScorer, remove_artifact
 
-class ModelManager:
+VECTORIZER_PARAMS = {"stop_words": "english", "max_features": 5000}
+CLASSIFIER_PARAMS = {"loss": "log_loss", "alpha": 0.0001, "max_iter": 1000, "tol": 1e-3, "random_state": 42}
+
+
+def _build_pipeline(params=None):
+    pipeline = Pipeline(
+        [
+            ("tfidf", TfidfVectorizer(**VECTORIZER_PARAMS)),
+            ("scaler", StandardScaler(with_mean=False)),
+            ("clf", SGDClassifier(**CLASSIFIER_PARAMS)),
+        ]
+    )
+    if params:
+        pipeline.set_params(**params)
+    return pipeline
+
+
+def _split_data(X, y):
+    X_train_val, X_test, y_train_val, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    X_train, X_val, y_train, y_val = train_test_split(X_train_val, y_train_val, test_size=0.25, random_state=42)
+    return X_train, X_val, X_test, y_train, y_val, y_test
+
+
+# Data shared with the worker processes, set once per worker by the pool initializer instead of per task
+_worker_data = {}
+
+
+def _init_worker(data):
+    _worker_data.update(data)
+
+
+def _fit_classifier(clf, X_vec, y, classes, num_iterations):
+    clf.fit(X_vec, y)
+    for _ in range(num_iterations):
+        clf.partial_fit(X_vec, y, classes=classes)
+    return clf
+
+
+def _fit_search_candidate(feature_key, clf_params, num_iterations):
+    X_train_vec, X_val_vec = _worker_data["features"][feature_key]
+    evaluator = _worker_data["evaluator"]
+    clf = SGDClassifier(**CLASSIFIER_PARAMS).set_params(**clf_params)
+    _fit_classifier(clf, X_train_vec, _worker_data["y_train"], evaluator.classes, num_iterations)
+    return clf, evaluator.compute(_worker_data["y_val_encoded"], clf.predict_proba(X_val_vec), "val")
+
+
+def _fit_cv_fold(train_index, test_index, num_iterations):
+    X = _worker_data["X"]
+    y = _worker_data["y"]
+    evaluator = _worker_data["evaluator"]
+    X_train = [X[i] for i in train_index]
+    X_test = [X[i] for i in test_index]
+
+    features = _build_pipeline()[:-1]
+    X_train_vec = features.fit_transform(X_train, y[train_index])
+    clf = _fit_classifier(
+        SGDClassifier(**CLASSIFIER_PARAMS), X_train_vec, y[train_index], evaluator.classes, num_iterations
+    )
+    y_test_encoded = _worker_data["y_encoded"][test_index]
+    return evaluator.compute(y_test_encoded, clf.predict_proba(features.transform(X_test)), "val")
+
+
+class ModelManager(InferenceModel):
     def __init__(
         self,
         project_root="./",
@@ -23,13 +87,11 @@ class ModelManager:
         model_filename="sentiment_model.joblib",
         data_filename="training_data.jsonl",
         experiment_tracker=None,
+        artifact_filename="sentiment_model.artifact",
     ):
-        self.project_root = project_root
-        self.model_dir = model_dir if model_dir else os.path.join(project_root, "models")
+        super().__init__(project_root, model_dir, model_filename, artifact_filename)
         self.data_dir = data_dir if data_dir else os.path.join(project_root, "data")
-        self.model_path = os.path.join(self.model_dir, model_filename)
         self.data_path = os.path.join(self.data_dir, data_filename)
-        self.model = None
         self.experiment_tracker = experiment_tracker
 
     def validate_setup(self):
@@ -47,7 +109,17 @@ class ModelManager:
         else:
             print(f"Data file exists: {self.data_path}")
 
-    def train(self, num_iterations=1000):
+    def train(
+        self, num_iterations=1000, eval_every=100, early_stopping=False, patience=5, min_delta=1e-4, restore_best=True
+    ):
+        """
+        Trains the model with partial_fit iterations, evaluating every eval_every iterations.
+        With early_stopping, training stops once the validation loss has not improved by min_delta
+        for patience evaluations, and restore_best puts back the coefficients of the best evaluation.
+        """
+        if eval_every < 1:
+            raise ValueError(f"eval_every must be at least 1, got {eval_every}.")
+
         print("Training model...")
         X, y = self._load_training_data()
 
@@ -55,114 +127,373 @@ class ModelManager:
         unique, counts = np.unique(y, return_counts=True)
         print("Class distribution:", dict(zip(unique, counts)))
 
-        X_train_val, X_test, y_train_val, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        X_train, X_val, y_train, y_val = train_test_split(X_train_val, y_train_val, test_size=0.25, random_state=42)
+        X_train, X_val, X_test, y_train, y_val, y_test = _split_data(X, y)
 
-        self.model = Pipeline([
-            ('tfidf', TfidfVectorizer(stop_words='english', max_features=5000)),
-            ('scaler', StandardScaler(with_mean=False)),
-            ('clf', SGDClassifier(loss='log_loss', alpha=0.0001, max_iter=1000, tol=1e-3, random_state=42))
-        ])
+        self.model = _build_pipeline()
 
         # Initial fit
         self.model.fit(X_train, y_train)
 
+        # Vectorize each split once and keep the sparse matrices resident for the whole loop,
+        # so that every iteration only pays for the partial_fit step itself.
+        features = self.model[:-1]
+        clf = self.model.named_steps["clf"]
+        X_train_vec = features.transform(X_train)
+        X_val_vec = features.transform(X_val)
+        classes = np.unique(y)
+
+        # Encode the labels of each split once, every evaluation then only builds one confusion matrix per split
+        evaluator = ClassificationMetrics(classes)
+        y_train_encoded = evaluator.encode(y_train)
+        y_val_encoded = evaluator.encode(y_val)
+
+        best_val_loss = np.inf
+        best_checkpoint = None
+        evaluations_without_improvement = 0
+
         for i in range(num_iterations):
             # Use partial_fit for online learning
-            self.model.named_steps['clf'].partial_fit(
-                self.model.named_steps['tfidf'].transform(X_train),
-                y_train,
-                classes=np.unique(y)
-            )
+            clf.partial_fit(X_train_vec, y_train, classes=classes)
 
-            # Calculate and log metrics
-            train_pred = self.model.predict(X_train)
-            val_pred = self.model.predict(X_val)
-            train_prob = self.model.predict_proba(X_train)
-            val_prob = self.model.predict_proba(X_val)
+            # Only evaluate every eval_every iterations and on the last one
+            if i % eval_every != 0 and i != num_iterations - 1:
+                continue
 
-            train_accuracy = accuracy_score(y_train, train_pred)
-            val_accuracy = accuracy_score(y_val, val_pred)
-
-            epsilon = 1e-15
-            train_loss = log_loss(y_train, np.clip(train_prob, epsilon, 1 - epsilon))
-            val_loss = log_loss(y_val, np.clip(val_prob, epsilon, 1 - epsilon))
+            # Calculate and log metrics
+            train_metrics = evaluator.compute(y_train_encoded, clf.predict_proba(X_train_vec), "train")
+            val_metrics = evaluator.compute(y_val_encoded, clf.predict_proba(X_val_vec), "val")
 
             if self.experiment_tracker:
                 metrics = {
-                    'iteration': i + 1,
-                    'train_samples': len(X_train),
-                    'train_accuracy': train_accuracy,
-                    'val_accuracy': val_accuracy,
-                    'train_loss': train_loss,
-                    'val_loss': val_loss,
-                    'train_precision': precision_score(y_train, train_pred, average='weighted', zero_division=0),
-                    'val_precision': precision_score(y_val, val_pred, average='weighted', zero_division=0),
-                    'train_recall': recall_score(y_train, train_pred, average='weighted', zero_division=0),
-                    'val_recall': recall_score(y_val, val_pred, average='weighted', zero_division=0),
-                    'train_f1': f1_score(y_train, train_pred, average='weighted', zero_division=0),
-                    'val_f1': f1_score(y_val, val_pred, average='weighted', zero_division=0),
+                    "iteration": i + 1,
+                    "train_samples": len(X_train),
+                    **train_metrics,
+                    **val_metrics,
                 }
                 self.experiment_tracker.log_metrics(metrics, step=i)
 
             # Print progress
-            if i % 100 == 0:
-                print(f"Iteration {i}: Train Loss: {train_loss:.4f}, Val Loss: {val_loss:.4f}")
+            train_loss = train_metrics["train_loss"]
+            val_loss = val_metrics["val_loss"]
+            print(f"Iteration {i}: Train Loss: {train_loss:.4f}, Val Loss: {val_loss:.4f}")
+
+            if early_stopping:
+                if val_loss < best_val_loss - min_delta:
+                    best_val_loss = val_loss
+                    best_checkpoint = (i, clf.coef_.copy(), clf.intercept_.copy())
+                    evaluations_without_improvement = 0
+                else:
+                    evaluations_without_improvement += 1
+                    if evaluations_without_improvement >= patience:
+                        print(f"Early stopping at iteration {i}: Val Loss did not improve for {patience} evaluations")
+                        break
+
+        if early_stopping and restore_best and best_checkpoint is not None:
+            best_iteration, clf.coef_, clf.intercept_ = best_checkpoint
+            print(f"Restored coefficients from iteration {best_iteration} (Val Loss: {best_val_loss:.4f})")
 
         # Final evaluation on test set
-        y_test_pred = self.model.predict(X_test)
-        test_accuracy = accuracy_score(y_test, y_test_pred)
-        test_precision = precision_score(y_test, y_test_pred, average='weighted', zero_division=0)
-        test_recall = recall_score(y_test, y_test_pred, average='weighted', zero_division=0)
-        test_f1 = f1_score(y_test, y_test_pred, average='weighted', zero_division=0)
+        test_metrics = evaluator.compute(evaluator.encode(y_test), self.model.predict_proba(X_test), "test")
+        if self.experiment_tracker:
+            self.experiment_tracker.log_metrics(test_metrics)
+
+        self._save_model()
+        self.export_inference_artifact()
+
+        if self.experiment_tracker:
+            self.experiment_tracker.log_model(self.model_path, "sentiment_model.joblib")
+            self.experiment_tracker.finish_run()
+
+    def search(self, param_grid, num_iterations=100, n_jobs=None):
+        """
+        Searches pipeline parameters (e.g. {'tfidf__max_features': [...], 'clf__alpha': [...]}) in parallel.
+        Candidates sharing tfidf/scaler settings share one vectorization of the corpus, only the
+        classifier fits are fanned out over the process pool. The best model by validation loss is saved.
+        """
+        print("Searching model parameters...")
+        X, y = self._load_training_data()
+        X_train, X_val, X_test, y_train, y_val, y_test = _split_data(X, y)
+        evaluator = ClassificationMetrics(np.unique(y))
+
+        candidates = list(ParameterGrid(param_grid))
+        candidate_keys = []
+        feature_steps = {}
+        features = {}
+        for params in candidates:
+            step_params = {name: value for name, value in params.items() if not name.startswith("clf__")}
+            key = repr(sorted(step_params.items()))
+            candidate_keys.append(key)
+            if key not in features:
+                steps = _build_pipeline(step_params)[:-1].fit(X_train, y_train)
+                feature_steps[key] = steps
+                features[key] = (steps.transform(X_train), steps.transform(X_val))
+        print(f"{len(candidates)} candidates over {len(features)} vectorizer settings")
+
+        # The grid entry of every candidate, prefixed with its index so the candidate metrics can be matched to it.
+        # Logged in one call, since some trackers replace their parameters on every log_params.
+        if self.experiment_tracker and hasattr(self.experiment_tracker, "log_params"):
+            self.experiment_tracker.log_params(
+                {
+                    f"candidate_{index}/{name}": value
+                    for index, params in enumerate(candidates)
+                    for name, value in params.items()
+                }
+            )
+
+        n_jobs = min(n_jobs or os.cpu_count() or 1, len(candidates))
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_init_worker,
+            initargs=(
+                {
+                    "features": features,
+                    "y_train": y_train,
+                    "y_val_encoded": evaluator.encode(y_val),
+                    "evaluator": evaluator,
+                },
+            ),
+        ) as executor:
+            futures = []
+            for params, key in zip(candidates, candidate_keys):
+                clf_params = {name[len("clf__") :]: value for name, value in params.items() if name.startswith("clf__")}
+                futures.append(executor.submit(_fit_search_candidate, key, clf_params, num_iterations))
+            fitted = [future.result() for future in futures]
+
+        results = []
+        for index, (params, (clf, val_metrics)) in enumerate(zip(candidates, fitted)):
+            results.append({"params": params, **val_metrics})
+            print(f"Candidate {index}: {params} Val Loss: {val_metrics['val_loss']:.4f}")
+            if self.experiment_tracker:
+                self.experiment_tracker.log_metrics({"candidate": index, **val_metrics}, step=index)
+
+        best = min(range(len(candidates)), key=lambda index: fitted[index][1]["val_loss"])
+        best_clf = fitted[best][0]
+        best_steps = feature_steps[candidate_keys[best]]
+        print(f"Best candidate {best}: {candidates[best]}")
+
+        self.model = Pipeline([*best_steps.steps, ("clf", best_clf)])
+        test_metrics = evaluator.compute(evaluator.encode(y_test), self.model.predict_proba(X_test), "test")
+        if self.experiment_tracker:
+            self.experiment_tracker.log_metrics(test_metrics)
+
+        self._save_model()
+        self.export_inference_artifact()
 
         if self.experiment_tracker:
-            final_metrics = {
-                'test_accuracy': test_accuracy,
-                'test_precision': test_precision,
-                'test_recall': test_recall,
-                'test_f1': test_f1
-            }
-            self.experiment_tracker.log_metrics(final_metrics)
+            self.experiment_tracker.log_model(self.model_path, "sentiment_model.joblib")
+            self.experiment_tracker.finish_run()
+
+        return {"best_params": candidates[best], "results": results}
+
+    def cross_validate(self, k=5, num_iterations=100, n_jobs=None, log_metrics=False):
+        """
+        Runs stratified k-fold cross-validation with the folds in parallel across cores.
+        The loaded data is handed to each worker once, every fold task only carries its indices.
+        """
+        print(f"Cross-validating model with {k} folds...")
+        X, y = self._load_training_data()
+        y = np.asarray(y)
+        evaluator = ClassificationMetrics(np.unique(y))
+        folds = list(StratifiedKFold(n_splits=k, shuffle=True, random_state=42).split(X, y))
+
+        n_jobs = min(n_jobs or os.cpu_count() or 1, k)
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_init_worker,
+            initargs=({"X": X, "y": y, "y_encoded": evaluator.encode(y), "evaluator": evaluator},),
+        ) as executor:
+            futures = [
+                executor.submit(_fit_cv_fold, train_index, test_index, num_iterations)
+                for train_index, test_index in folds
+            ]
+            fold_metrics = [future.result() for future in futures]
+
+        mean_metrics = {}
+        std_metrics = {}
+        for name in fold_metrics[0]:
+            values = [metrics[name] for metrics in fold_metrics]
+            mean_metrics[name.replace("val_", "cv_mean_", 1)] = float(np.mean(values))
+            std_metrics[name.replace("val_", "cv_std_", 1)] = float(np.std(values))
+
+        for fold, metrics in enumerate(fold_metrics):
+            print(f"Fold {fold}: Val Loss: {metrics['val_loss']:.4f}, Val Accuracy: {metrics['val_accuracy']:.4f}")
+        print(f"Mean Val Loss: {mean_metrics['cv_mean_loss']:.4f} (+/- {std_metrics['cv_std_loss']:.4f})")
+
+        if log_metrics and self.experiment_tracker:
+            for fold, metrics in enumerate(fold_metrics):
+                self.experiment_tracker.log_metrics({"fold": fold, **metrics}, step=fold)
+            self.experiment_tracker.log_metrics({**mean_metrics, **std_metrics})
+
+        return {"folds": fold_metrics, "mean": mean_metrics, "std": std_metrics}
+
+    def update(self, texts, labels):
+        """
+        Applies partial_fit on newly labeled texts through the fitted vectorizer and scaler.
+        The result is written as a new versioned model next to model_path and then promoted to model_path.
+        """
+        print(f"Updating model with {len(texts)} examples...")
+        if self.model is None or isinstance(self.model, LinearTextScorer):
+            self.model = None
+            self.load_model()
 
+        clf = self.model.named_steps["clf"]
+        unknown_labels = set(labels) - set(clf.classes_)
+        if unknown_labels:
+            raise ValueError(f"Unknown labels {sorted(unknown_labels)}. Please retrain the model to add new classes.")
+
+        clf.partial_fit(self.model[:-1].transform(texts), labels)
+
+        # Build the scorer before anything is written, so a model whose artifact cannot be refreshed
+        # is rejected without promoting it next to a stale artifact
+        scorer = LinearTextScorer.from_pipeline(self.model) if os.path.exists(self.artifact_path) else None
+
+        version_path = self._save_model_version()
+        self._update_model_version(self.model_path)
+        print(f"Model saved to {version_path} and {self.model_path}")
+        if scorer is not None:
+            scorer.save(self.artifact_path)
+            print(f"Inference artifact saved to {self.artifact_path}")
+
+        if self.experiment_tracker:
+            self.experiment_tracker.log_model(version_path, os.path.basename(version_path))
+        return version_path
+
+    def _save_model(self):
         joblib.dump(self.model, self.model_path)
+        self._update_model_version(self.model_path)
         print(f"Model saved to {self.model_path}")
 
+    def _save_model_version(self):
+        base, extension = os.path.splitext(self.model_path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.model_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                joblib.dump(self.model, f)
+
+            # Hard links make both the versioned file and model_path appear complete or not at all,
+            # and link fails instead of overwriting if another update claimed the same version
+            version = self._latest_model_version() + 1
+            while True:
+                version_path = f"{base}.v{version:04d}{extension}"
+                try:
+                    os.link(tmp_path, version_path)
+                    break
+                except FileExistsError:
+                    version += 1
+            os.replace(tmp_path, self.model_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return version_path
+
+    def _latest_model_version(self):
+        base, extension = os.path.splitext(os.path.basename(self.model_path))
+        pattern = re.compile(re.escape(base) + r"\.v(\d+)" + re.escape(extension) + "$")
+        versions = [int(match.group(1)) for match in map(pattern.match, os.listdir(self.model_dir)) if match]
+        return max(versions, default=0)
+
+    def export_inference_artifact(self):
+        """
+        Exports vocabulary, idf, scaler and classifier weights for the standalone LinearTextScorer.
+        """
+        if self.model is None:
+            self.load_model()
+
+        scorer = self.model if isinstance(self.model, LinearTextScorer) else LinearTextScorer.from_pipeline(self.model)
+        scorer.save(self.artifact_path)
+        print(f"Inference artifact saved to {self.artifact_path}")
+
+    def _remove_inference_artifact(self):
+        if os.path.lexists(self.artifact_path):
+            remove_artifact(self.artifact_path)
+            print(f"Removed stale inference artifact {self.artifact_path}")
+
+    def train_streaming(self, chunk_size=10000, num_epochs=1, n_features=2**20):
+        """
+        Trains the model out-of-core, streaming the training data in chunks through a hashed vocabulary.
+        Each chunk is scored before the model learns from it (progressive validation).
+        """
+        print("Training model from stream...")
+        vectorizer = HashingVectorizer(stop_words="english", n_features=n_features, alternate_sign=False)
+        scaler = StandardScaler(with_mean=False)
+        clf = SGDClassifier(**CLASSIFIER_PARAMS)
+
+        labels = set()
+        for texts, chunk_labels in self._iter_training_chunks(chunk_size):
+            scaler.partial_fit(vectorizer.transform(texts))
+            labels.update(chunk_labels)
+        classes = np.array(sorted(labels))
+        evaluator = ClassificationMetrics(classes)
+        print("Classes:", list(classes))
+
+        step = 0
+        for epoch in range(num_epochs):
+            for texts, chunk_labels in self._iter_training_chunks(chunk_size):
+                X_chunk = scaler.transform(vectorizer.transform(texts))
+
+                if step > 0:
+                    chunk_metrics = evaluator.compute(
+                        evaluator.encode(chunk_labels), clf.predict_proba(X_chunk), "progressive"
+                    )
+
+                    if self.experiment_tracker:
+                        metrics = {
+                            "epoch": epoch + 1,
+                            "chunk": step,
+                            "chunk_samples": len(texts),
+                            **chunk_metrics,
+                        }
+                        self.experiment_tracker.log_metrics(metrics, step=step)
+
+                    chunk_loss = chunk_metrics["progressive_loss"]
+                    chunk_accuracy = chunk_metrics["progressive_accuracy"]
+                    print(f"Chunk {step}: Progressive Loss: {chunk_loss:.4f}, Accuracy: {chunk_accuracy:.4f}")
+
+                clf.partial_fit(X_chunk, chunk_labels, classes=classes)
+                step += 1
+
+        self.model = Pipeline([("hashing", vectorizer), ("scaler", scaler), ("clf", clf)])
+
+        # A hashed vocabulary cannot be exported to the LinearTextScorer, so an artifact of an earlier
+        # model is removed before the new model is saved and serving falls back to the joblib Pipeline
+        self._remove_inference_artifact()
+        self._save_model()
+
         if self.experiment_tracker:
             self.experiment_tracker.log_model(self.model_path, "sentiment_model.joblib")
             self.experiment_tracker.finish_run()
 
+    def _iter_training_chunks(self, chunk_size):
+        texts = []
+        labels = []
+        with open(self.data_path, "r") as f:
+            for line in f:
+                example = json.loads(line)
+                texts.append(example["text"])
+                labels.append(example["label"])
+                if len(texts) == chunk_size:
+                    yield texts, labels
+                    texts = []
+                    labels = []
+        if texts:
+            yield texts, labels
+
     def _load_training_data(self):
         texts = []
         labels = []
-        with open(self.data_path, 'r') as f:
+        with open(self.data_path, "r") as f:
             for line in f:
                 example = json.loads(line)
-                texts.append(example['text'])
-                labels.append(example['label'])
+                texts.append(example["text"])
+                labels.append(example["label"])
         return texts, labels
 
-
-    def predict(self, text):
-        if self.model is None:
-            self.load_model()
-
-        prediction = self.model.predict([text])[0]
-        probability = np.max(self.model.predict_proba([text]))
-        return prediction, probability
-
-    def load_model(self):
-        if os.path.exists(self.model_path):
-            self.model = joblib.load(self.model_path)
-            print(f"Model loaded from {self.model_path}")
-        else:
-            raise FileNotFoundError(f"No model found at {self.model_path}. Please train the model first.")
-
     def get_project_info(self):
         return {
             "project_root": self.project_root,
             "model_directory": self.model_dir,
             "data_directory": self.data_dir,
             "model_path": self.model_path,
+            "artifact_path": self.artifact_path,
             "data_path": self.data_path,
         }
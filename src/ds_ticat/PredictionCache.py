@@ -0,0 +1,182 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def model_normalizer(model):
+    """
+    Returns a function reducing a text to the token sequence the model's vectorizer sees, built from the
+    vectorizer's own lowercase and token_pattern, or None if texts have to be keyed as they are.
+    For a lowercasing model "Danke!" and "danke" share a cache entry, for a case-sensitive one they do not.
+    """
+    # The vectorizer is the first step of a Pipeline, a LinearTextScorer carries the settings itself
+    steps = getattr(model, "steps", None)
+    vectorizer = steps[0][1] if steps else model
+    token_pattern = getattr(vectorizer, "token_pattern", None)
+    lowercase = getattr(vectorizer, "lowercase", None)
+    custom_analysis = (
+        getattr(vectorizer, "analyzer", "word") != "word"
+        or getattr(vectorizer, "preprocessor", None) is not None
+        or getattr(vectorizer, "tokenizer", None) is not None
+    )
+    if token_pattern is None or lowercase is None or custom_analysis:
+        return None
+
+    find_tokens = re.compile(token_pattern).findall
+    if lowercase:
+        return lambda text: " ".join(find_tokens(text.lower()))
+    return lambda text: " ".join(find_tokens(text))
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache with optional TTL in front of ModelManager.predict_batch.
+    Entries are keyed on a hash of the model version and the normalized text, and concurrent requests
+    for the same key wait for the one prediction in flight instead of computing it again.
+    Without an explicit normalize function, texts are normalized like the loaded model's vectorizer does.
+    """
+
+    def __init__(self, maxsize=10000, ttl=None, normalize=None, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.normalize = normalize
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._model_normalizer = (None, None)
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """
+        Builds a cache from PREDICTION_CACHE_SIZE and PREDICTION_CACHE_TTL, or returns None if the size is 0.
+        """
+        maxsize = int(environ.get("PREDICTION_CACHE_SIZE", 10000))
+        if maxsize <= 0:
+            return None
+        ttl = float(environ.get("PREDICTION_CACHE_TTL", 0))
+        return cls(maxsize=maxsize, ttl=ttl if ttl > 0 else None)
+
+    def key(self, text, model_version, normalize=None):
+        normalize = normalize or self.normalize
+        data = f"{model_version}\0{normalize(text) if normalize else text}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def _normalizer(self, model_manager, model_version):
+        """
+        Returns the normalize function of this cache, or the one of the loaded model, derived once per model version.
+        """
+        if self.normalize is not None:
+            return self.normalize
+        version, normalize = self._model_normalizer
+        if version is None or version != model_version:
+            normalize = model_normalizer(model_manager.model)
+            self._model_normalizer = (model_version, normalize)
+        return normalize
+
+    def predict(self, model_manager, text):
+        predictions, confidences = self.predict_batch(model_manager, [text])
+        return predictions[0], confidences[0]
+
+    def predict_batch(self, model_manager, texts):
+        """
+        Returns labels and confidences like model_manager.predict_batch, scoring only the uncached texts.
+        """
+        if model_manager.model is None:
+            model_manager.load_model()
+        model_version = model_manager.model_version
+        normalize = self._normalizer(model_manager, model_version)
+        results = [None] * len(texts)
+        owned = {}
+        waiting = []
+
+        with self._lock:
+            now = self.clock()
+            for index, text in enumerate(texts):
+                key = self.key(text, model_version, normalize)
+                value = self._get(key, now)
+                if value is not None:
+                    results[index] = value
+                elif key in owned:
+                    # Repeats within one batch are scored once
+                    self.hits += 1
+                    owned[key][2].append(index)
+                elif key in self._in_flight:
+                    self.hits += 1
+                    waiting.append((index, self._in_flight[key]))
+                else:
+                    self.misses += 1
+                    future = Future()
+                    self._in_flight[key] = future
+                    owned[key] = (text, future, [index])
+
+        # Score owned keys before waiting on other threads, so two overlapping batches cannot deadlock
+        if owned:
+            self._compute(model_manager, owned, results)
+        for index, future in waiting:
+            results[index] = future.result()
+
+        return [label for label, confidence in results], [confidence for label, confidence in results]
+
+    def _compute(self, model_manager, owned, results):
+        try:
+            predictions, confidences = model_manager.predict_batch([text for text, _, _ in owned.values()])
+        except BaseException as e:
+            with self._lock:
+                for key in owned:
+                    self._in_flight.pop(key, None)
+            for _, future, _ in owned.values():
+                future.set_exception(e)
+            raise
+
+        values = list(zip(predictions, confidences))
+        with self._lock:
+            expires = self.clock() + self.ttl if self.ttl else None
+            for (key, (_, _, indices)), value in zip(owned.items(), values):
+                self._entries[key] = (value, expires)
+                self._entries.move_to_end(key)
+                self._in_flight.pop(key, None)
+                for index in indices:
+                    results[index] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        for (_, future, _), value in zip(owned.values(), values):
+            future.set_result(value)
+
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= now:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "in_flight": len(self._in_flight),
+            }
@@ -0,0 +1,116 @@
+import cProfile
+import glob
+import itertools
+import os
+import pstats
+import threading
+from contextlib import nullcontext
+
+_NULL_PROFILE = nullcontext()
+
+
+class RequestProfiler:
+    """
+    Profiles one in every N requests with cProfile and aggregates them into pstats files.
+    The aggregate is rewritten every dump_every profiled requests and a new file is started every
+    requests_per_file, keeping at most max_files files in the directory.
+    """
+
+    def __init__(self, every=0, directory="/tmp/ticat_profiles", dump_every=10, requests_per_file=1000, max_files=20):
+        self.every = every
+        self.directory = directory
+        self.dump_every = dump_every
+        self.requests_per_file = requests_per_file
+        self.max_files = max_files
+        self._counter = itertools.count()
+        # Only one request is profiled at a time, which bounds the overhead under concurrency
+        # and avoids running two profilers at once, which newer Pythons do not allow
+        self._busy = threading.Lock()
+        self._stats = None
+        self._profiled = 0
+        self._file_index = 0
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        """
+        Builds a profiler from TICAT_PROFILE_EVERY, TICAT_PROFILE_DIR and TICAT_PROFILE_MAX_FILES.
+        Profiling is off unless TICAT_PROFILE_EVERY is set to a positive N.
+        """
+        return cls(
+            every=int(environ.get("TICAT_PROFILE_EVERY", 0)),
+            directory=environ.get("TICAT_PROFILE_DIR", "/tmp/ticat_profiles"),
+            max_files=int(environ.get("TICAT_PROFILE_MAX_FILES", 20)),
+        )
+
+    @property
+    def enabled(self):
+        return self.every > 0
+
+    def profile(self):
+        """
+        Returns a context manager that profiles the enclosed request if it is one of the sampled ones.
+        """
+        if self.every <= 0 or next(self._counter) % self.every:
+            return _NULL_PROFILE
+        if not self._busy.acquire(blocking=False):
+            return _NULL_PROFILE
+        return _ProfiledRequest(self)
+
+    def _finish(self, profiler):
+        try:
+            if self._stats is None:
+                self._stats = pstats.Stats(profiler)
+            else:
+                self._stats.add(profiler)
+            self._profiled += 1
+
+            if self._profiled % self.dump_every == 0 or self._profiled >= self.requests_per_file:
+                self.dump()
+            if self._profiled >= self.requests_per_file:
+                self._stats = None
+                self._profiled = 0
+                self._file_index += 1
+        finally:
+            self._busy.release()
+
+    def dump(self):
+        """
+        Writes the aggregated stats of the current file, loadable with pstats, snakeviz or flameprof.
+        """
+        if self._stats is None:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"profile-{os.getpid()}-{self._file_index:04d}.prof")
+        tmp_path = f"{path}.tmp"
+        self._stats.dump_stats(tmp_path)
+        os.replace(tmp_path, path)
+        self._remove_old_files()
+        return path
+
+    def _remove_old_files(self):
+        paths = sorted(glob.glob(os.path.join(self.directory, "profile-*.prof")), key=os.path.getmtime)
+        for path in paths[: max(len(paths) - self.max_files, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class _ProfiledRequest:
+    __slots__ = ("owner", "profiler")
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        try:
+            self.profiler.enable()
+        except BaseException:
+            self.owner._busy.release()
+            raise
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.disable()
+        self.owner._finish(self.profiler)
@@ -0,0 +1,12 @@
+import os
+
+
+def available_cpus():
+    """
+    Returns the number of CPUs this process may run on, which is less than os.cpu_count()
+    under a CPU affinity mask or a container cpuset.
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
@@ -1,10 +1,11 @@
 import json
 
 from germansentiment import SentimentModel
-from Greetingfilter import Greetingfilter
 from TextPreProcessor import TextPreProcessor
 from TextTokenizer import TextTokenizer
 
+from src.ds_ticat.GreetingLexicon import GreetingLexicon
+
 event = {
     "Item": {
         "ticket_id": {"N": "2720903312"},
@@ -19,8 +20,9 @@ content = event["Item"]["content"]["S"]
 # Text preprocessing
 processed_conntent = TextPreProcessor.process_text(content)
 print("step1:", processed_conntent)
-# Greeting cutting
-content_wo_greetings = Greetingfilter.cut_after_greetings(processed_conntent, greet_file, key_name="greetings")
+# Greeting cutting, the lexicon is parsed once and reloaded in the background when the file changes
+greetings = GreetingLexicon.get(greet_file, key_name="greetings")
+content_wo_greetings = greetings.cut(processed_conntent)
 print("step2:", content_wo_greetings)
 # Tokenizer
 final_content = TextTokenizer.tokenize_text(content_wo_greetings)
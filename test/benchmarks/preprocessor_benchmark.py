@@ -0,0 +1,79 @@
+"""
+Times TextPreProcessor.process_text on adversarial inputs of growing size, next to the original regex
+pipeline. The original runs in a child process with a time limit, since it backtracks exponentially.
+
+    python test/benchmarks/preprocessor_benchmark.py --sizes 1000 10000 100000 1000000 --timeout 5
+"""
+
+import argparse
+import html
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+
+from ds_ticat.TextPreProcessor import TextPreProcessor  # noqa: E402
+
+# Each input repeats a fragment until it reaches the requested size
+ADVERSARIAL = {
+    "unclosed media query": lambda n: "@media screen {" + "a" * n,
+    "nested media query": lambda n: "@media screen {" + "{a" * (n // 2),
+    "repeated @media": lambda n: "@media" * (n // 6) + "{",
+    "unclosed cid image": lambda n: "[cid:image" * (n // 10),
+    "unclosed tags": lambda n: "<a" * (n // 2),
+    "html email": lambda n: ("<p style='x'>Hallo&nbsp;Team,</p>\r\n@media a { b { c: d } }[cid:image1]" * n)[:n],
+}
+
+
+def original_pipeline(text):
+    text = re.sub(r"@media[^{]+\{(?:[^{}]+|\{[^{}]*\})*\}", "", text)
+    text = re.sub(r"\[cid:image[^\]]+\]", "", text)
+    text = re.sub(r"[\n\r]+", " ", text)
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"&nbsp;", " ", text)
+    text = html.unescape(text)
+    text = re.sub(r'[,.!?"]+', " ", text)
+    text = re.sub(r"[^\w\s]", " ", text)
+    text = re.sub(r"\d+", " ", text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def time_call(function, text):
+    start = time.perf_counter()
+    function(text)
+    return time.perf_counter() - start
+
+
+def time_original(text, timeout):
+    with multiprocessing.Pool(1) as pool:
+        result = pool.apply_async(time_call, (original_pipeline, text))
+        try:
+            return f"{result.get(timeout):.4f}s"
+        except multiprocessing.TimeoutError:
+            pool.terminate()
+            return f"> {timeout}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--timeout", type=float, default=5, help="Time limit for the original pipeline")
+    parser.add_argument("--skip-original", action="store_true")
+    args = parser.parse_args()
+
+    processor = TextPreProcessor(max_input_chars=None)
+    print(f"{'input':<22} {'chars':>9} {'process_text':>13} {'original':>10}")
+    for name, build in ADVERSARIAL.items():
+        for size in args.sizes:
+            text = build(size)
+            new = time_call(processor.process_text, text)
+            original = "skipped" if args.skip_original else time_original(text, args.timeout)
+            print(f"{name:<22} {len(text):>9} {new:>12.4f}s {original:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Measures the request throughput of the Lambda serving modes under concurrent single-text requests.
+Each mode is started as a server process on a local port and driven by --concurrency client threads.
+The prediction cache is disabled by default, since the few benchmark texts would otherwise be answered
+from the cache and the numbers would not include scoring.
+
+    python test/benchmarks/serving_benchmark.py --modes flask async --requests 2000 --concurrency 32
+"""
+
+import argparse
+import http.client
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+
+from test.helpers import free_port, make_project  # noqa: E402
+
+LAMBDA_DIR = os.path.join(ROOT_DIR, "infrastructure", "lambda")
+
+# SERVER_MODE of lambda_flask_wrapper for each benchmarked mode, the plain Flask development server if None
+MODES = {"flask": None, "async": "async", "prefork": "prefork"}
+
+TEXTS = [
+    "I love this product!",
+    "This is terrible.",
+    "Das Programm stürzt beim Export der Rechnungen ab",
+    "Wie kann ich meine Bankverbindung ändern?",
+]
+
+
+def start_server(mode, model_dir, port, cache_size):
+    env = dict(
+        os.environ,
+        MODEL_DIR=model_dir,
+        PORT=str(port),
+        PREDICTION_CACHE_SIZE=str(cache_size),
+        PYTHONPATH=os.pathsep.join([os.path.join(ROOT_DIR, "src"), LAMBDA_DIR]),
+    )
+    env.pop("SERVER_MODE", None)
+    if MODES[mode]:
+        env["SERVER_MODE"] = MODES[mode]
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(LAMBDA_DIR, "lambda_flask_wrapper.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{mode} server exited with status {process.returncode}")
+        try:
+            post(http.client.HTTPConnection("127.0.0.1", port, timeout=5), TEXTS[0])
+            return process
+        except (ConnectionError, OSError):
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def post(connection, text):
+    connection.request("POST", "/", body=json.dumps({"text": text}), headers={"Content-Type": "application/json"})
+    response = connection.getresponse()
+    response.read()
+    if response.status != 200:
+        raise RuntimeError(f"Unexpected status {response.status}")
+
+
+def run_load(port, num_requests, concurrency):
+    latencies = []
+    lock = threading.Lock()
+    remaining = iter(range(num_requests))
+
+    def client():
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        own = []
+        while True:
+            with lock:
+                index = next(remaining, None)
+            if index is None:
+                break
+            start = time.perf_counter()
+            post(connection, TEXTS[index % len(TEXTS)])
+            own.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, statistics.median(latencies), latencies[int(0.99 * (len(latencies) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", help="Directory with a trained model, a temporary one is trained if omitted")
+    parser.add_argument("--modes", nargs="+", default=["flask", "async"], choices=list(MODES))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--cache-size", type=int, default=0, help="PREDICTION_CACHE_SIZE of the servers, 0 disables it")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    model_dir = args.model_dir
+    if model_dir is None:
+        model_manager = make_project(num_iterations=10)
+        tmp_dir = model_manager.project_root
+        model_dir = model_manager.model_dir
+
+    try:
+        print(f"PREDICTION_CACHE_SIZE={args.cache_size}, {len(TEXTS)} distinct texts")
+        print(f"{'mode':<10} {'requests/s':>12} {'p50':>10} {'p99':>10}")
+        for mode in args.modes:
+            port = free_port()
+            process = start_server(mode, model_dir, port, args.cache_size)
+            try:
+                throughput, p50, p99 = run_load(port, args.requests, args.concurrency)
+            finally:
+                process.terminate()
+                process.wait()
+            print(f"{mode:<10} {throughput:>12.1f} {p50 * 1000:>8.2f}ms {p99 * 1000:>8.2f}ms")
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Measures the cold start of the serving entry points: interpreter start, imports and model load,
+each in a fresh process. Exits with status 1 if a target fails to import or load, or if a median
+exceeds --max-seconds, so it can gate CI. Targets whose dependencies are not installed, like
+sagemaker_inference outside the SageMaker environment, are only skipped when named in --allow-missing.
+
+    python test/benchmarks/startup_benchmark.py --model-dir models --repeat 5 --max-seconds 1.5
+    python test/benchmarks/startup_benchmark.py --max-seconds 1.5 --allow-missing sagemaker
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, ROOT_DIR)
+
+from test.helpers import make_project  # noqa: E402
+
+# Each target runs in a child process and prints the seconds spent on imports plus model load
+TARGETS = {
+    "inference_model": (
+        ["src"],
+        "from ds_ticat.InferenceModel import InferenceModel\n"
+        "InferenceModel(model_dir=MODEL_DIR).load_model(use_artifact=True)\n",
+    ),
+    "lambda": (
+        ["src", "infrastructure/lambda"],
+        "import lambda_handler\n" "assert lambda_handler.MODEL_MANAGER is not None, lambda_handler.MODEL_LOAD_ERROR\n",
+    ),
+    "sagemaker": (
+        ["src", "infrastructure/sagemaker"],
+        "from inference_handler import ContainerModelInferenceHandler\n"
+        "ContainerModelInferenceHandler().initialize(MODEL_DIR)\n",
+    ),
+}
+
+CHILD_TEMPLATE = """
+import json, os, time
+start = time.perf_counter()
+MODEL_DIR = os.environ["MODEL_DIR"]
+{code}
+elapsed = time.perf_counter() - start
+print("STARTUP_SECONDS " + json.dumps(elapsed))
+"""
+
+
+def run_target(name, model_dir):
+    paths, code = TARGETS[name]
+    env = dict(
+        os.environ,
+        MODEL_DIR=model_dir,
+        PYTHONPATH=os.pathsep.join(os.path.join(ROOT_DIR, path) for path in paths),
+        TICAT_METRICS="0",
+    )
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD_TEMPLATE.format(code=code)], env=env, capture_output=True, text=True
+    )
+    total = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    line = next(line for line in result.stdout.splitlines() if line.startswith("STARTUP_SECONDS "))
+    return json.loads(line.split(" ", 1)[1]), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", help="Directory with a trained model, a temporary one is trained if omitted")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS), choices=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, help="Fail if the median import-plus-load time exceeds this")
+    parser.add_argument(
+        "--allow-missing", nargs="+", default=[], choices=list(TARGETS), help="Skip these targets if they fail to load"
+    )
+    args = parser.parse_args()
+
+    tmp_dir = None
+    model_dir = args.model_dir
+    if model_dir is None:
+        model_manager = make_project(num_iterations=10)
+        tmp_dir = model_manager.project_root
+        model_dir = model_manager.model_dir
+
+    failed = False
+    try:
+        print(f"{'target':<16} {'import+load p50':>16} {'min':>8} {'process p50':>12}")
+        for name in args.targets:
+            try:
+                runs = [run_target(name, model_dir) for _ in range(args.repeat)]
+            except RuntimeError as e:
+                if name in args.allow_missing:
+                    print(f"{name:<16} skipped: {e}")
+                else:
+                    print(f"{name:<16} failed: {e}")
+                    failed = True
+                continue
+            startup = statistics.median(run[0] for run in runs)
+            process = statistics.median(run[1] for run in runs)
+            print(f"{name:<16} {startup:>15.3f}s {min(run[0] for run in runs):>7.3f}s {process:>11.3f}s")
+            if args.max_seconds is not None and startup > args.max_seconds:
+                print(f"{name}: {startup:.3f}s exceeds --max-seconds {args.max_seconds}")
+                failed = True
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Fixtures shared by the test modules: a temporary project with the bundled training data,
+fresh imports of the serving modules against a trained model and a stand-in for sagemaker_inference.
+"""
+
+import importlib
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import types
+
+from src.ds_ticat.ModelManager import ModelManager
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILE = os.path.join(ROOT_DIR, "data", "training_data.jsonl")
+
+
+def make_project(num_iterations=None, experiment_tracker=None):
+    """
+    Creates a temporary project with the bundled training data and returns its ModelManager,
+    trained for num_iterations if given. Remove model_manager.project_root when done.
+    """
+    test_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(test_dir, "data"))
+    os.makedirs(os.path.join(test_dir, "models"))
+    shutil.copy(DATA_FILE, os.path.join(test_dir, "data"))
+    model_manager = ModelManager(project_root=test_dir, experiment_tracker=experiment_tracker)
+    if num_iterations is not None:
+        model_manager.train(num_iterations=num_iterations)
+    return model_manager
+
+
+def load_texts(limit=None):
+    with open(DATA_FILE, "r") as f:
+        texts = [json.loads(line)["text"] for line in f]
+    return texts[:limit]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def import_serving_module(name, directory, model_dir, unload=()):
+    """
+    Imports a fresh copy of module name from infrastructure/<directory> with MODEL_DIR set to model_dir,
+    after dropping the modules in unload that it imports in turn. Returns the module and a function that
+    restores sys.path, MODEL_DIR and sys.modules.
+    """
+    saved_path = list(sys.path)
+    saved_model_dir = os.environ.get("MODEL_DIR")
+    names = [*unload, name]
+
+    def restore():
+        for module_name in names:
+            sys.modules.pop(module_name, None)
+        sys.path[:] = saved_path
+        if saved_model_dir is None:
+            os.environ.pop("MODEL_DIR", None)
+        else:
+            os.environ["MODEL_DIR"] = saved_model_dir
+
+    sys.path[:0] = [os.path.join(ROOT_DIR, "src"), os.path.join(ROOT_DIR, "infrastructure", directory)]
+    os.environ["MODEL_DIR"] = model_dir
+    for module_name in names:
+        sys.modules.pop(module_name, None)
+    try:
+        return importlib.import_module(name), restore
+    except BaseException:
+        restore()
+        raise
+
+
+class _StubTransformer:
+    """
+    Runs a request through the inference handler like sagemaker_inference's Transformer,
+    reading the content types from the attributes of the context.
+    """
+
+    def __init__(self, default_inference_handler):
+        self._handler = default_inference_handler
+        self._model = None
+
+    def transform(self, data, context):
+        if self._model is None:
+            self._model = self._handler.default_model_fn(context.model_dir)
+        input_data = self._handler.default_input_fn(data, context.request_content_type)
+        prediction = self._handler.default_predict_fn(input_data, self._model)
+        return self._handler.default_output_fn(prediction, context.accept)
+
+
+class _StubHandlerService:
+    def __init__(self, transformer):
+        self._service = transformer
+
+    def handle(self, data, context):
+        return self._service.transform(data, context)
+
+
+def install_sagemaker_inference_stub():
+    """
+    Registers a minimal sagemaker_inference package in sys.modules, so the SageMaker serving modules
+    can be imported without the model server. Returns a function that removes it again.
+    """
+    modules = {
+        "sagemaker_inference": types.ModuleType("sagemaker_inference"),
+        "sagemaker_inference.default_inference_handler": types.ModuleType("default_inference_handler"),
+        "sagemaker_inference.default_handler_service": types.ModuleType("default_handler_service"),
+        "sagemaker_inference.transformer": types.ModuleType("transformer"),
+        "sagemaker_inference.model_server": types.ModuleType("model_server"),
+    }
+    modules["sagemaker_inference.default_inference_handler"].DefaultInferenceHandler = type(
+        "DefaultInferenceHandler", (), {}
+    )
+    modules["sagemaker_inference.default_handler_service"].DefaultHandlerService = _StubHandlerService
+    modules["sagemaker_inference.transformer"].Transformer = _StubTransformer
+    # start_model_server only records the handler service it was started with
+    model_server = modules["sagemaker_inference.model_server"]
+    model_server.started = []
+    model_server.start_model_server = lambda handler_service=None: model_server.started.append(handler_service)
+    for name, module in modules.items():
+        if "." in name:
+            setattr(modules["sagemaker_inference"], name.split(".", 1)[1], module)
+
+    saved = {name: sys.modules.get(name) for name in modules}
+    sys.modules.update(modules)
+
+    def remove():
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+    return remove
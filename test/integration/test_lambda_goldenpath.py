@@ -46,3 +46,14 @@ def test_invalid_lambda_input():
     assert response.status_code == 400
     response_body = response.json()
     assert "Invalid input" in response_body
+
+
+def test_lambda_batch_request():
+    texts = ["I love this product!", "This is terrible.", "Neutral statement."]
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    payload = {"texts": texts + [{"invalid_key": "This should fail"}]}
+    response = requests.post(LAMBDA_URL, json=payload, headers=headers)
+    assert response.status_code == 200
+    result = response.json()
+    assert [record["text"] for record in result["results"]] == texts
+    assert result["batchItemFailures"] == [{"itemIdentifier": "3"}]
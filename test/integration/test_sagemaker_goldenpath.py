@@ -43,3 +43,51 @@ def test_invalid_sagemaker_input():
     response = requests.post(f"{SAGEMAKER_URL}/invocations", json=payload, headers=headers)
     assert response.status_code == 500  # The current behavior returns 500 for invalid input
     assert "Input data should be a string or a dictionary with 'text' key" in response.text
+
+
+def test_sagemaker_batch_request():
+    texts = ["I love this product!", "This is terrible.", "Neutral statement."]
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    for payload in [texts, {"texts": texts}]:
+        response = requests.post(f"{SAGEMAKER_URL}/invocations", json=payload, headers=headers)
+        assert response.status_code == 200
+        result = response.json()
+        assert len(result) == len(texts)
+        for record in result:
+            assert "label" in record
+            assert "confidence" in record
+            assert "model_id" in record
+
+
+def test_sagemaker_batch_jsonlines_and_csv():
+    texts = ["I love this product!", "This is terrible.", "Neutral statement."]
+    headers = {"Content-Type": "application/json", "Accept": "application/json"}
+    single_results = [
+        requests.post(f"{SAGEMAKER_URL}/invocations", json={"text": text}, headers=headers).json() for text in texts
+    ]
+
+    headers = {"Content-Type": "application/jsonlines", "Accept": "application/jsonlines"}
+    body = "\n".join(json.dumps({"text": text}) for text in texts)
+    response = requests.post(f"{SAGEMAKER_URL}/invocations", data=body, headers=headers)
+    assert response.status_code == 200
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["label"] for record in records] == [result["label"] for result in single_results]
+
+    headers = {"Content-Type": "text/csv", "Accept": "text/csv"}
+    response = requests.post(f"{SAGEMAKER_URL}/invocations", data="\n".join(texts), headers=headers)
+    assert response.status_code == 200
+    labels = [line.split(",")[0] for line in response.text.splitlines()]
+    assert labels == [result["label"] for result in single_results]
+
+    # Rows are only treated as a header when declared, and blank rows keep their output line
+    rows = ["text", "", texts[0]]
+    response = requests.post(f"{SAGEMAKER_URL}/invocations", data="\n".join(rows), headers=headers)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == len(rows)
+
+    headers = {"Content-Type": "text/csv; header=present", "Accept": "text/csv"}
+    body = "id,text\n" + "\n".join(f"{index},{text}" for index, text in enumerate(texts))
+    response = requests.post(f"{SAGEMAKER_URL}/invocations", data=body, headers=headers)
+    assert response.status_code == 200
+    labels = [line.split(",")[0] for line in response.text.splitlines()]
+    assert labels == [result["label"] for result in single_results]
@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    log_loss,
+    precision_score,
+    recall_score,
+)
+
+from src.ds_ticat.ClassificationMetrics import ClassificationMetrics
+
+
+class TestClassificationMetrics(unittest.TestCase):
+    def setUp(self):
+        self.classes = np.array(["NEGATIVE", "NEUTRAL", "POSITIVE"])
+        self.metrics = ClassificationMetrics(self.classes)
+
+    def assert_matches_sklearn(self, y_true, probabilities):
+        result = self.metrics.compute(self.metrics.encode(y_true), probabilities, "val")
+        y_pred = self.classes[np.argmax(probabilities, axis=1)]
+        self.assertAlmostEqual(result["val_accuracy"], accuracy_score(y_true, y_pred))
+        self.assertAlmostEqual(
+            result["val_precision"], precision_score(y_true, y_pred, average="weighted", zero_division=0)
+        )
+        self.assertAlmostEqual(result["val_recall"], recall_score(y_true, y_pred, average="weighted", zero_division=0))
+        self.assertAlmostEqual(result["val_f1"], f1_score(y_true, y_pred, average="weighted", zero_division=0))
+        self.assertAlmostEqual(result["val_loss"], log_loss(y_true, probabilities, labels=self.classes), places=6)
+
+    def test_matches_sklearn(self):
+        rng = np.random.default_rng(42)
+        y_true = self.classes[rng.integers(0, 3, size=200)]
+        probabilities = rng.dirichlet(np.ones(3), size=200)
+        self.assert_matches_sklearn(y_true, probabilities)
+
+    def test_missing_classes(self):
+        # A class without support and a class that is never predicted both count as zero
+        y_true = np.array(["NEGATIVE", "POSITIVE", "POSITIVE", "NEGATIVE"])
+        probabilities = np.array([[0.7, 0.2, 0.1], [0.6, 0.3, 0.1], [0.1, 0.1, 0.8], [0.2, 0.7, 0.1]])
+        self.assert_matches_sklearn(y_true, probabilities)
+
+    def test_confusion_matrix(self):
+        matrix = self.metrics.confusion_matrix(np.array([0, 0, 1, 2, 2]), np.array([0, 2, 1, 2, 0]))
+        np.testing.assert_array_equal(matrix, [[1, 0, 1], [0, 1, 0], [1, 0, 1]])
+
+    def test_unknown_labels(self):
+        with self.assertRaises(ValueError):
+            self.metrics.encode(["POSITIVE", "ANGRY"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from src.ds_ticat.CorpusPreprocessor import CorpusPreprocessor, main
+from src.ds_ticat.TextPreProcessor import TextPreProcessor
+
+
+class TestCorpusPreprocessor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, "tickets.jsonl")
+        self.output_path = os.path.join(self.temp_dir.name, "tickets.preprocessed.jsonl")
+        self.greetings_file = os.path.join(self.temp_dir.name, "greetings.txt")
+        with open(self.greetings_file, "w", encoding="utf-8") as f:
+            f.write('"Viele Grüße",\n"Mit freundlichen Grüßen",\n')
+
+        self.records = [
+            {"id": i, "text": f"<p>Ticket&nbsp;{i}: Rechnung Nr. {i} fehlt!</p>\r\nViele Grüße, Max", "label": "A"}
+            for i in range(57)
+        ]
+        self.records.append({"id": 57, "label": "B"})
+        with open(self.input_path, "w", encoding="utf-8") as f:
+            for index, record in enumerate(self.records):
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                if index % 10 == 0:
+                    f.write("\n")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_output(self):
+        with open(self.output_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_matches_sequential_processing_in_order(self):
+        preprocessor = CorpusPreprocessor(workers=2, chunk_size=4, max_pending=2)
+        self.assertEqual(preprocessor.process_file(self.input_path, self.output_path), len(self.records))
+
+        processor = TextPreProcessor()
+        expected = [
+            {**record, "text": processor.process_text(record["text"])} if "text" in record else record
+            for record in self.records
+        ]
+        self.assertEqual(self.read_output(), expected)
+        self.assertFalse(os.path.exists(f"{self.output_path}.tmp"))
+
+    def test_cuts_greetings_into_output_field(self):
+        preprocessor = CorpusPreprocessor(
+            workers=2, chunk_size=16, output_field="clean_text", greetings_file=self.greetings_file
+        )
+        preprocessor.process_file(self.input_path, self.output_path)
+        output = self.read_output()
+        self.assertEqual(output[3]["clean_text"], "ticket rechnung nr fehlt")
+        self.assertEqual(output[3]["text"], self.records[3]["text"])
+        self.assertNotIn("clean_text", output[-1])
+
+    def test_chunks_skip_blank_lines_and_keep_line_numbers(self):
+        preprocessor = CorpusPreprocessor(workers=1, chunk_size=2)
+        chunks = list(preprocessor._chunks(["a\n", "\n", "b\n", "c\n"]))
+        self.assertEqual(chunks, [(1, ["a\n", "b\n"]), (4, ["c\n"])])
+
+    def test_invalid_json_reports_line_and_leaves_no_output(self):
+        with open(self.input_path, "a", encoding="utf-8") as f:
+            f.write("{not json\n")
+        preprocessor = CorpusPreprocessor(workers=2, chunk_size=8)
+        with self.assertRaisesRegex(ValueError, "line 65"):
+            preprocessor.process_file(self.input_path, self.output_path)
+        self.assertFalse(os.path.exists(self.output_path))
+        self.assertFalse(os.path.exists(f"{self.output_path}.tmp"))
+
+    def test_command_line(self):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            main([self.input_path, self.output_path, "--workers", "2", "--chunk-size", "10"])
+        self.assertIn(f"Preprocessed {len(self.records)} records", stdout.getvalue())
+        self.assertEqual(len(self.read_output()), len(self.records))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import os
+import tempfile
+import time
+import unittest
+
+from src.ds_ticat.Greetingfilter import GreetingProcessor
+from src.ds_ticat.GreetingLexicon import GreetingLexicon
+
+
+class CountingProcessor(GreetingProcessor):
+    def __init__(self):
+        self.loads = 0
+
+    def load_and_process_greetings_sequences(self, greetings_file, key_name=None):
+        self.loads += 1
+        return super().load_and_process_greetings_sequences(greetings_file, key_name)
+
+
+class TestGreetingLexicon(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.greetings_file = os.path.join(self.temp_dir.name, "greetings.txt")
+        self.write_greetings('"Viele Grüße",\n\n"Mit freundlichen Grüßen",\n', mtime=1_000_000)
+        GreetingLexicon._matchers.clear()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_greetings(self, content, mtime):
+        with open(self.greetings_file, "w", encoding="utf-8") as f:
+            f.write(content)
+        # Explicit mtimes, so changes within the file system's timestamp resolution are still seen
+        os.utime(self.greetings_file, (mtime, mtime))
+
+    def test_cuts_with_processed_greetings(self):
+        lexicon = GreetingLexicon(self.greetings_file)
+        self.assertEqual(lexicon.cut("danke viele grüße max"), "danke")
+        self.assertEqual(lexicon.cut_batch(["a mit freundlichen grüßen", "b"]), ["a", "b"])
+
+    def test_yaml_greetings_under_key_name(self):
+        # Only the list under key_name is used, the key itself does not become a greeting
+        yaml_file = os.path.join(self.temp_dir.name, "greetings.yaml")
+        with open(yaml_file, "w", encoding="utf-8") as f:
+            f.write('greetings:\n  - "Viele Grüße"\n  - "LG"\n')
+        lexicon = GreetingLexicon(yaml_file, key_name="greetings")
+        self.assertEqual(lexicon.cut("danke lg max"), "danke")
+        self.assertEqual(lexicon.cut("greetings from berlin"), "greetings from berlin")
+
+    def test_unchanged_file_is_not_parsed_again(self):
+        processor = CountingProcessor()
+        lexicon = GreetingLexicon(self.greetings_file, processor=processor)
+        self.assertFalse(lexicon.reload())
+        self.assertEqual(processor.loads, 1)
+
+    def test_matcher_is_shared_per_path_and_mtime(self):
+        processor = CountingProcessor()
+        first = GreetingLexicon(self.greetings_file, processor=processor)
+        second = GreetingLexicon(self.greetings_file, processor=processor)
+        self.assertIs(first.matcher, second.matcher)
+        self.assertEqual(processor.loads, 1)
+
+    def test_reload_on_change(self):
+        lexicon = GreetingLexicon(self.greetings_file)
+        old_matcher = lexicon.matcher
+        self.write_greetings("LG\n", mtime=1_000_100)
+        self.assertTrue(lexicon.reload())
+        self.assertIsNot(lexicon.matcher, old_matcher)
+        self.assertEqual(lexicon.cut("danke lg max viele grüße"), "danke")
+        self.assertEqual(len(GreetingLexicon._matchers), 1)
+
+    def test_missing_file_keeps_current_matcher(self):
+        lexicon = GreetingLexicon(self.greetings_file)
+        matcher = lexicon.matcher
+        os.remove(self.greetings_file)
+        self.assertFalse(lexicon.reload())
+        self.assertIs(lexicon.matcher, matcher)
+
+    def test_background_reload(self):
+        lexicon = GreetingLexicon(self.greetings_file, poll_interval=0.01)
+        lexicon.start()
+        try:
+            self.write_greetings("LG\n", mtime=1_000_200)
+            deadline = time.monotonic() + 5
+            while lexicon.cut("a lg b") != "a" and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(lexicon.cut("a lg b"), "a")
+        finally:
+            lexicon.stop()
+
+    def test_get_returns_shared_started_lexicon(self):
+        lexicon = GreetingLexicon.get(self.greetings_file, poll_interval=60)
+        try:
+            self.assertIs(GreetingLexicon.get(self.greetings_file), lexicon)
+            self.assertTrue(lexicon._thread.is_alive())
+        finally:
+            lexicon.stop()
+            GreetingLexicon._instances.pop((lexicon.greetings_file, None), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import random
+import unittest
+
+from src.ds_ticat.Greetingfilter import GreetingProcessor
+from src.ds_ticat.GreetingMatcher import GreetingMatcher
+
+
+def reference_find(text, greetings):
+    # Earliest start over all greetings, checked with plain str.find
+    starts = [text.find(greeting) for greeting in greetings if greeting]
+    starts = [start for start in starts if start >= 0]
+    return min(starts) if starts else None
+
+
+class TestGreetingMatcher(unittest.TestCase):
+    def setUp(self):
+        self.greetings = ["mit freundlichen grüßen", "viele grüße", "grüße", "lg", "beste grüße aus köln"]
+        self.matcher = GreetingMatcher(self.greetings)
+
+    def test_cuts_before_earliest_greeting(self):
+        text = "danke für die hilfe lg max viele grüße max"
+        self.assertEqual(self.matcher.cut(text), "danke für die hilfe")
+
+    def test_earliest_position_wins_over_list_order(self):
+        # "mit freundlichen grüßen" comes first in the list but later in the text
+        text = "bitte prüfen viele grüße und mit freundlichen grüßen"
+        self.assertEqual(self.matcher.find(text), (13, 24))
+        self.assertEqual(self.matcher.cut(text), "bitte prüfen")
+
+    def test_greeting_that_is_a_suffix_of_another(self):
+        # "grüße" ends first, but "viele grüße" starts earlier
+        self.assertEqual(self.matcher.find("ok viele grüße"), (3, 14))
+
+    def test_overlapping_greetings(self):
+        matcher = GreetingMatcher(["bcd", "abcde", "c"])
+        self.assertEqual(matcher.find("xabcdex"), (1, 6))
+        self.assertEqual(matcher.find("xbcdx"), (1, 4))
+
+    def test_text_without_greeting_is_unchanged(self):
+        text = "  keine verabschiedung hier  "
+        self.assertIsNone(self.matcher.find(text))
+        self.assertEqual(self.matcher.cut(text), text)
+
+    def test_empty_greetings(self):
+        matcher = GreetingMatcher(["", ""])
+        self.assertIsNone(matcher.find("irgendein text"))
+        self.assertEqual(matcher.cut("irgendein text"), "irgendein text")
+
+    def test_batch(self):
+        texts = ["a lg b", "nichts", "", "x grüße"]
+        self.assertEqual(self.matcher.cut_batch(texts), ["a", "nichts", "", "x"])
+
+    def test_matches_reference_on_random_texts(self):
+        rng = random.Random(7)
+        alphabet = "abc "
+        for _ in range(300):
+            count = rng.randint(1, 6)
+            greetings = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(count)]
+            matcher = GreetingMatcher(greetings)
+            for _ in range(10):
+                text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+                match = matcher.find(text)
+                start = None if match is None else match[0]
+                self.assertEqual(start, reference_find(text, greetings), (greetings, text))
+                if match is not None:
+                    self.assertIn(text[match[0] : match[1]], greetings)
+
+
+class TestGreetingProcessor(unittest.TestCase):
+    def test_cut_after_greetings_sequences(self):
+        processor = GreetingProcessor()
+        greetings = ["mit freundlichen grüßen", "viele grüße"]
+        text = "alles gut viele grüße mit freundlichen grüßen"
+        self.assertEqual(processor.cut_after_greetings_sequences(text, greetings), "alles gut")
+        self.assertEqual(processor.cut_after_greetings_sequences(text, GreetingMatcher(greetings)), "alles gut")
+        self.assertEqual(
+            processor.cut_after_greetings_sequences_batch([text, "ohne gruß"], greetings), ["alles gut", "ohne gruß"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
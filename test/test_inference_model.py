@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+from test.helpers import ROOT_DIR, load_texts, make_project
+
+import numpy as np
+
+from src.ds_ticat.InferenceModel import InferenceModel
+
+# Loads the artifact and predicts in a fresh interpreter, then lists the scikit-learn modules it imported
+IMPORT_CHECK = """
+import json, sys
+from ds_ticat.InferenceModel import InferenceModel
+model = InferenceModel(model_dir=sys.argv[1])
+model.load_model(use_artifact=True)
+model.predict_batch(["Das Programm stürzt beim Export ab"])
+print(json.dumps(sorted(name for name in sys.modules if name.split(".")[0] in ("sklearn", "joblib", "scipy"))))
+"""
+
+
+class TestInferenceModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_manager = make_project(num_iterations=20)
+        cls.texts = load_texts(20)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.model_manager.project_root)
+
+    def test_matches_model_manager(self):
+        for use_artifact in (False, True):
+            model = InferenceModel(model_dir=self.model_manager.model_dir)
+            model.load_model(use_artifact=use_artifact)
+            predictions, confidences = model.predict_batch(self.texts)
+            expected_predictions, expected_confidences = self.model_manager.predict_batch(self.texts)
+            np.testing.assert_array_equal(predictions, expected_predictions)
+            np.testing.assert_allclose(confidences, expected_confidences, rtol=1e-9)
+
+    def test_artifact_path_does_not_import_training_dependencies(self):
+        env = dict(os.environ, PYTHONPATH=os.path.join(ROOT_DIR, "src"))
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_CHECK, self.model_manager.model_dir],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(json.loads(output.splitlines()[-1]), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import shutil
+import unittest
+from test.helpers import import_serving_module, make_project
+
+
+class TestAsyncLambdaServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # lambda_handler loads its model at import time from MODEL_DIR
+        cls.model_manager = make_project(num_iterations=5)
+        cls.server_module, cls.restore_imports = import_serving_module(
+            "lambda_async_server", "lambda", cls.model_manager.model_dir, unload=["lambda_handler"]
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.restore_imports()
+        shutil.rmtree(cls.model_manager.project_root)
+
+    def exchange(self, chunks, delay=0):
+        """
+        Sends the request chunks to a fresh server, waiting delay seconds before the last one,
+        and returns everything the server wrote until it closed the connection.
+        """
+
+        async def run():
+            app = self.server_module.AsyncLambdaServer(max_wait_ms=1)
+            await app.batcher.start()
+            server = await asyncio.start_server(app.handle_connection, "127.0.0.1", 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                for index, chunk in enumerate(chunks):
+                    if delay and index == len(chunks) - 1:
+                        await asyncio.sleep(delay)
+                    writer.write(chunk)
+                    await writer.drain()
+                response = await asyncio.wait_for(reader.read(), 5)
+                writer.close()
+                return response
+            finally:
+                server.close()
+                await server.wait_closed()
+                await app.batcher.stop()
+
+        return asyncio.run(run())
+
+    def test_content_length_request(self):
+        body = json.dumps({"text": "I love this product!"}).encode("utf-8")
+        head = f"POST / HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+        response = self.exchange([head + body])
+        self.assertTrue(response.startswith(b"HTTP/1.1 200 OK"))
+        self.assertIn(b'"sentiment"', response)
+
+    def test_rejects_undecodable_body(self):
+        # A batch body takes the handler path, which used to fail decoding after the response was due
+        body = json.dumps(["a", "b"]).encode("utf-16")
+        head = f"POST / HTTP/1.1\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+        response = self.exchange([head + body])
+        self.assertTrue(response.startswith(b"HTTP/1.1 400 Bad Request"))
+        self.assertIn(b"not valid UTF-8", response)
+
+    def test_rejects_chunked_body(self):
+        # The chunk bytes must not be parsed as a second request
+        body = json.dumps({"text": "I love this product!"}).encode("utf-8")
+        request = (
+            b"POST / HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+            + f"{len(body):x}\r\n".encode("latin-1")
+            + body
+            + b"\r\n0\r\n\r\n"
+        )
+        response = self.exchange([request])
+        self.assertTrue(response.startswith(b"HTTP/1.1 501 Not Implemented"))
+        self.assertEqual(response.count(b"HTTP/1.1"), 1)
+
+    def test_slow_body_times_out(self):
+        self.server_module.READ_TIMEOUT_SECONDS, saved_timeout = 0.2, self.server_module.READ_TIMEOUT_SECONDS
+        try:
+            response = self.exchange([b"POST / HTTP/1.1\r\nContent-Length: 10\r\n\r\n", b"{}"], delay=0.5)
+        finally:
+            self.server_module.READ_TIMEOUT_SECONDS = saved_timeout
+        self.assertTrue(response.startswith(b"HTTP/1.1 408 Request Timeout"))
+
+    def test_idle_connection_is_closed(self):
+        self.server_module.IDLE_TIMEOUT_SECONDS, saved_timeout = 0.2, self.server_module.IDLE_TIMEOUT_SECONDS
+        try:
+            response = self.exchange([b""])
+        finally:
+            self.server_module.IDLE_TIMEOUT_SECONDS = saved_timeout
+        self.assertEqual(response, b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import base64
+import json
+import shutil
+import unittest
+from test.helpers import import_serving_module, make_project
+
+
+def sqs_record(message_id, body):
+    return {"messageId": message_id, "body": body, "eventSource": "aws:sqs"}
+
+
+def kinesis_record(sequence_number, payload):
+    data = base64.b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+    return {"kinesis": {"sequenceNumber": sequence_number, "data": data}, "eventSource": "aws:kinesis"}
+
+
+def dynamodb_record(sequence_number, event_name, new_image=None):
+    dynamodb = {"SequenceNumber": sequence_number, "Keys": {"id": {"S": sequence_number}}}
+    if new_image is not None:
+        dynamodb["NewImage"] = new_image
+    return {"eventName": event_name, "dynamodb": dynamodb, "eventSource": "aws:dynamodb"}
+
+
+class TestLambdaHandlerRecords(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The handler loads its model at import time from MODEL_DIR
+        cls.model_manager = make_project(num_iterations=5)
+        cls.handler, cls.restore_imports = import_serving_module(
+            "lambda_handler", "lambda", cls.model_manager.model_dir
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.restore_imports()
+        shutil.rmtree(cls.model_manager.project_root)
+
+    def test_sqs_records(self):
+        records = [
+            sqs_record("m1", json.dumps({"text": "I love this product!"})),
+            sqs_record("m2", "not json"),
+            sqs_record("m3", json.dumps({"body": "no text"})),
+        ]
+        response = self.handler.lambda_handler({"Records": records}, None)
+        self.assertEqual([result["record_id"] for result in response["results"]], ["m1"])
+        self.assertEqual(response["batchItemFailures"], [{"itemIdentifier": "m2"}, {"itemIdentifier": "m3"}])
+
+    def test_kinesis_records(self):
+        records = [
+            kinesis_record("k1", {"text": "This is terrible."}),
+            kinesis_record("k2", {"text": "I love this product!"}),
+            kinesis_record("k3", {"text": 42}),
+        ]
+        response = self.handler.handle_records(records)
+        self.assertEqual([result["record_id"] for result in response["results"]], ["k1", "k2"])
+        self.assertEqual(response["batchItemFailures"], [{"itemIdentifier": "k3"}])
+        expected, _ = self.handler.MODEL_MANAGER.predict_batch(["This is terrible.", "I love this product!"])
+        self.assertEqual([result["sentiment"] for result in response["results"]], [str(label) for label in expected])
+
+    def test_dynamodb_records(self):
+        # REMOVE and keys-only records are acknowledged instead of being reported as failures
+        records = [
+            dynamodb_record("s1", "INSERT", {"content": {"S": "I love this product!"}}),
+            dynamodb_record("s2", "REMOVE"),
+            dynamodb_record("s3", "MODIFY", {"content": {"S": "This is terrible."}}),
+            dynamodb_record("s4", "MODIFY"),
+            dynamodb_record("s5", "INSERT", {"title": {"S": "no content"}}),
+        ]
+        response = self.handler.handle_records(records)
+        self.assertEqual([result["record_id"] for result in response["results"]], ["s1", "s3"])
+        self.assertEqual(response["batchItemFailures"], [{"itemIdentifier": "s5"}])
+
+    def test_model_not_loaded_fails_every_record(self):
+        records = [sqs_record("m1", json.dumps({"text": "I love this product!"})), dynamodb_record("s2", "REMOVE")]
+        model_manager = self.handler.MODEL_MANAGER
+        self.handler.MODEL_MANAGER = None
+        try:
+            response = self.handler.handle_records(records)
+        finally:
+            self.handler.MODEL_MANAGER = model_manager
+        self.assertEqual(response["results"], [])
+        self.assertEqual(response["batchItemFailures"], [{"itemIdentifier": "m1"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
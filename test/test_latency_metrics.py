@@ -0,0 +1,68 @@
+import shutil
+import tempfile
+import unittest
+import urllib.request
+
+from src.ds_ticat.LatencyMetrics import LatencyMetrics, serve_metrics
+
+
+class TestLatencyMetrics(unittest.TestCase):
+    def test_quantiles_within_one_bucket(self):
+        metrics = LatencyMetrics()
+        for i in range(1, 1001):
+            metrics.observe("predict", i / 1000)
+        summary = metrics.summary()["predict"]
+        self.assertEqual(summary["count"], 1000)
+        self.assertAlmostEqual(summary["mean"], 0.5005)
+        for name, expected in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            # Bucket bounds grow by 1.5x, so an estimate is off by less than that factor
+            self.assertLess(summary[name] / expected, 1.5)
+            self.assertGreater(summary[name] / expected, 1 / 1.5)
+
+    def test_time_records_stage(self):
+        metrics = LatencyMetrics()
+        with metrics.time("decode"):
+            pass
+        with metrics.time("decode"):
+            pass
+        self.assertEqual(metrics.snapshot()["decode"]["count"], 2)
+
+    def test_disabled_records_nothing(self):
+        metrics = LatencyMetrics(enabled=False)
+        self.assertIs(metrics.time("decode"), metrics.time("encode"))
+        with metrics.time("decode"):
+            pass
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_render_prometheus_histogram(self):
+        metrics = LatencyMetrics(buckets=(0.01, 0.1))
+        metrics.observe("encode", 0.005)
+        metrics.observe("encode", 0.05)
+        metrics.observe("encode", 5)
+        lines = metrics.render().splitlines()
+        self.assertIn("# TYPE ticat_stage_latency_seconds histogram", lines)
+        self.assertIn('ticat_stage_latency_seconds_bucket{stage="encode",le="0.01"} 1', lines)
+        self.assertIn('ticat_stage_latency_seconds_bucket{stage="encode",le="0.1"} 2', lines)
+        self.assertIn('ticat_stage_latency_seconds_bucket{stage="encode",le="+Inf"} 3', lines)
+        self.assertIn('ticat_stage_latency_seconds_count{stage="encode"} 3', lines)
+        self.assertIn('ticat_stage_latency_quantile_seconds{stage="encode",quantile="0.5"} 0.055', lines)
+
+    def test_merges_worker_snapshots(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        worker = LatencyMetrics()
+        worker.observe("predict", 0.01)
+        worker.write_snapshot(directory)
+
+        merged = LatencyMetrics.merge([worker.read_snapshots(directory), worker.snapshot()])
+        self.assertEqual(merged["predict"]["count"], 2)
+
+        server = serve_metrics(lambda: worker.render(worker.read_snapshots(directory)), 0, host="127.0.0.1")
+        self.addCleanup(server.shutdown)
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            body = response.read().decode("utf-8")
+        self.assertIn('ticat_stage_latency_seconds_count{stage="predict"} 1', body)
+
+
+if __name__ == "__main__":
+    unittest.main()
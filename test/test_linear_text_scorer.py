@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import unittest
+from test.helpers import load_texts, make_project
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.pipeline import Pipeline
+
+from src.ds_ticat.LinearTextScorer import LinearTextScorer, remove_artifact
+from src.ds_ticat.ModelManager import ModelManager
+
+
+class TestLinearTextScorer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Train one small model and export its inference artifact
+        cls.model_manager = make_project(num_iterations=20)
+        cls.test_dir = cls.model_manager.project_root
+        cls.texts = load_texts() + [
+            "",
+            "!!!",
+            "unknownword anotherunknownword",
+            "GREAT great Great, terrible TERRIBLE",
+            "a b c",
+        ]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.test_dir)
+
+    def test_export_writes_artifact(self):
+        self.assertTrue(os.path.exists(self.model_manager.artifact_path))
+
+    def test_matches_pipeline(self):
+        # The exported scorer reproduces the pipeline's labels and probabilities
+        scorer = LinearTextScorer.load(self.model_manager.artifact_path)
+        pipeline = self.model_manager.model
+        np.testing.assert_array_equal(scorer.classes_, pipeline.classes_)
+        np.testing.assert_array_equal(scorer.predict(self.texts), pipeline.predict(self.texts))
+        np.testing.assert_allclose(
+            scorer.predict_proba(self.texts), pipeline.predict_proba(self.texts), rtol=1e-9, atol=1e-12
+        )
+
+    def test_load_memory_maps_arrays(self):
+        scorer = LinearTextScorer.load(self.model_manager.artifact_path)
+        for array in (scorer.terms, scorer.idf, scorer.scale, scorer.coef, scorer.intercept):
+            self.assertIsInstance(array, np.memmap)
+
+    def test_model_manager_loads_artifact(self):
+        # ModelManager can serve predictions straight from the memory-mapped artifact
+        model_manager = ModelManager(project_root=self.test_dir)
+        model_manager.load_model(use_artifact=True)
+        self.assertIsInstance(model_manager.model, LinearTextScorer)
+        predictions, probabilities = model_manager.predict_batch(self.texts)
+        expected_predictions, expected_probabilities = self.model_manager.predict_batch(self.texts)
+        np.testing.assert_array_equal(predictions, expected_predictions)
+        np.testing.assert_allclose(probabilities, expected_probabilities, rtol=1e-9)
+
+    def test_save_switches_versions_with_a_symlink(self):
+        # Every save writes a new version directory and atomically repoints the artifact symlink
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "model.artifact")
+        scorer = LinearTextScorer.load(self.model_manager.artifact_path)
+
+        # A plain directory from an earlier release and the leftovers of a crashed save are replaced
+        os.makedirs(path)
+        os.makedirs(f"{path}.tmp-12345")
+        scorer.save(path)
+        self.assertTrue(os.path.islink(path))
+        first_version = os.path.realpath(path)
+        loaded = LinearTextScorer.load(path)
+
+        scorer.save(path)
+        second_version = os.path.realpath(path)
+        self.assertNotEqual(first_version, second_version)
+        # The replaced version stays for readers still loading it until the next save
+        self.assertEqual(
+            sorted(os.listdir(directory)), sorted(map(os.path.basename, [path, first_version, second_version]))
+        )
+        np.testing.assert_array_equal(loaded.predict(self.texts), LinearTextScorer.load(path).predict(self.texts))
+
+        scorer.save(path)
+        self.assertFalse(os.path.exists(first_version))
+        self.assertEqual(len(os.listdir(directory)), 3)
+
+        remove_artifact(path)
+        self.assertEqual(os.listdir(directory), [])
+
+    def test_rejects_unsupported_pipeline(self):
+        pipeline = self.model_manager.model
+        pipeline.named_steps["tfidf"].set_params(sublinear_tf=True)
+        try:
+            with self.assertRaises(ValueError):
+                LinearTextScorer.from_pipeline(pipeline)
+        finally:
+            pipeline.named_steps["tfidf"].set_params(sublinear_tf=False)
+
+    def test_rejects_hashed_pipeline(self):
+        pipeline = Pipeline([("hashing", HashingVectorizer()), *self.model_manager.model.steps[1:]])
+        with self.assertRaises(ValueError):
+            LinearTextScorer.from_pipeline(pipeline)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,54 @@
-from src.ds_ticat.ModelManager import ModelManager
-import unittest
 import os
-import tempfile
 import shutil
+import tempfile
+import unittest
+from test.helpers import make_project
 
-class TestModelManager(unittest.TestCase):
+import numpy as np
+
+from src.ds_ticat.InferenceModel import InferenceModel
+from src.ds_ticat.LinearTextScorer import LinearTextScorer
+from src.ds_ticat.ModelManager import ModelManager
+
+
+class RecordingTracker:
+    def __init__(self):
+        self.logged = []
+        self.params = {}
+        self.models = []
+        self.finished = False
+
+    def log_metrics(self, metrics, step=None):
+        self.logged.append((step, metrics))
+
+    def log_params(self, params):
+        self.params.update(params)
+
+    def log_model(self, model, name):
+        self.models.append((model, name))
+
+    def finish_run(self):
+        self.finished = True
 
+
+class CoefficientTracker(RecordingTracker):
+    """
+    Also snapshots the classifier weights at every evaluation, read through get_clf once training has started.
+    """
+
+    def __init__(self, get_clf):
+        super().__init__()
+        self.get_clf = get_clf
+        self.coefficients = []
+
+    def log_metrics(self, metrics, step=None):
+        super().log_metrics(metrics, step)
+        if step is not None:
+            clf = self.get_clf()
+            self.coefficients.append((metrics["val_loss"], clf.coef_.copy(), clf.intercept_.copy()))
+
+
+class TestModelManager(unittest.TestCase):
     def setUp(self):
         # Create a temporary directory for testing
         self.test_dir = tempfile.mkdtemp()
@@ -21,6 +64,15 @@ class TestModelManager(unittest.TestCase):
         self.assertEqual(self.model_manager.model_dir, os.path.join(self.test_dir, "models"))
         self.assertEqual(self.model_manager.data_dir, os.path.join(self.test_dir, "data"))
 
+    def test_experiment_tracker_is_fifth_positional_parameter(self):
+        # Parameters added after the baseline come last, positional callers keep working
+        tracker = RecordingTracker()
+        model_manager = ModelManager(
+            self.test_dir, None, None, "sentiment_model.joblib", "training_data.jsonl", tracker
+        )
+        self.assertIs(model_manager.experiment_tracker, tracker)
+        self.assertEqual(os.path.basename(model_manager.artifact_path), "sentiment_model.artifact")
+
     def test_validate_setup(self):
         # Test if validate_setup creates necessary directories
         self.model_manager.validate_setup()
@@ -39,5 +91,166 @@ class TestModelManager(unittest.TestCase):
         self.assertIn(prediction, ["POSITIVE", "NEGATIVE"])
         self.assertTrue(0 <= probability <= 1)
 
-if __name__ == '__main__':
+
+class TestModelManagerTraining(unittest.TestCase):
+    def setUp(self):
+        # Create a temporary project with the bundled training data
+        self.tracker = RecordingTracker()
+        self.model_manager = make_project(experiment_tracker=self.tracker)
+        self.test_dir = self.model_manager.project_root
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir)
+
+    def test_train_evaluates_on_cadence(self):
+        # Metrics are only computed every eval_every iterations and on the last one
+        self.model_manager.train(num_iterations=25, eval_every=10)
+        steps = [step for step, metrics in self.tracker.logged if step is not None]
+        self.assertEqual(steps, [0, 10, 20, 24])
+        self.assertTrue(os.path.exists(self.model_manager.model_path))
+        self.assertTrue(self.tracker.finished)
+
+    def test_train_rejects_invalid_eval_every(self):
+        with self.assertRaises(ValueError):
+            self.model_manager.train(num_iterations=5, eval_every=0)
+        self.assertFalse(os.path.exists(self.model_manager.model_path))
+
+    def test_train_early_stopping(self):
+        # Training stops once the validation loss stops improving for patience evaluations
+        self.model_manager.train(num_iterations=1000, eval_every=1, early_stopping=True, patience=3, min_delta=1e-2)
+        val_losses = [metrics["val_loss"] for step, metrics in self.tracker.logged if step is not None]
+        self.assertLess(len(val_losses), 1000)
+        best_before_stop = min(val_losses[:-3])
+        for val_loss in val_losses[-3:]:
+            self.assertGreaterEqual(val_loss, best_before_stop - 1e-2)
+
+    def test_train_early_stopping_restores_best(self):
+        # restore_best puts back the weights of the evaluation with the lowest validation loss
+        for restore_best in (True, False):
+            tracker = CoefficientTracker(lambda: self.model_manager.model.named_steps["clf"])
+            self.model_manager.experiment_tracker = tracker
+            self.model_manager.train(
+                num_iterations=1000,
+                eval_every=1,
+                early_stopping=True,
+                patience=3,
+                min_delta=1e-2,
+                restore_best=restore_best,
+            )
+            # The best evaluation is the last one that improved on the previous best by more than min_delta
+            best, best_val_loss = None, np.inf
+            for index, (val_loss, coef, intercept) in enumerate(tracker.coefficients):
+                if val_loss < best_val_loss - 1e-2:
+                    best, best_val_loss = index, val_loss
+            self.assertLess(best, len(tracker.coefficients) - 1)
+            expected = tracker.coefficients[best] if restore_best else tracker.coefficients[-1]
+
+            clf = self.model_manager.model.named_steps["clf"]
+            np.testing.assert_array_equal(clf.coef_, expected[1])
+            np.testing.assert_array_equal(clf.intercept_, expected[2])
+            if not restore_best:
+                self.assertFalse(np.array_equal(clf.coef_, tracker.coefficients[best][1]))
+
+    def test_train_streaming(self):
+        # Streaming training feeds the classifier chunk by chunk with a hashed vocabulary
+        self.model_manager.train_streaming(chunk_size=32, num_epochs=2)
+        self.assertTrue(os.path.exists(self.model_manager.model_path))
+        self.assertEqual([step for step, metrics in self.tracker.logged], list(range(1, 8)))
+
+        self.model_manager.model = None
+        prediction, probability = self.model_manager.predict("This is a great product!")
+        self.assertIn(prediction, ["POSITIVE", "NEGATIVE"])
+        self.assertTrue(0 <= probability <= 1)
+
+    def test_train_streaming_replaces_artifact(self):
+        # Serving with use_artifact picks up the streamed model instead of the artifact of the earlier one
+        self.model_manager.train(num_iterations=5)
+        self.assertTrue(os.path.exists(self.model_manager.artifact_path))
+        self.model_manager.train_streaming(chunk_size=32)
+        self.assertFalse(os.path.exists(self.model_manager.artifact_path))
+
+        serving = InferenceModel(model_dir=self.model_manager.model_dir)
+        serving.load_model(use_artifact=True)
+        self.assertIn("hashing", serving.model.named_steps)
+        self.assertEqual(serving.model_version, self.model_manager.model_version)
+
+    def test_predict_batch(self):
+        # Batch prediction matches single predictions and keeps the input order
+        self.model_manager.train(num_iterations=10)
+        texts = ["This is a great product!", "This is terrible", "I'm so happy"]
+        predictions, probabilities = self.model_manager.predict_batch(texts)
+        self.assertEqual(len(predictions), len(texts))
+        for text, prediction, probability in zip(texts, predictions, probabilities):
+            self.assertEqual(self.model_manager.predict(text), (prediction, probability))
+
+    def test_search(self):
+        # Every candidate is reported and the best one is saved
+        param_grid = {"tfidf__max_features": [50, 5000], "clf__alpha": [0.0001, 0.01]}
+        result = self.model_manager.search(param_grid, num_iterations=5, n_jobs=2)
+        self.assertEqual(len(result["results"]), 4)
+        self.assertIn(result["best_params"], [candidate["params"] for candidate in result["results"]])
+        self.assertEqual([step for step, metrics in self.tracker.logged if step is not None], [0, 1, 2, 3])
+        for candidate in [metrics["candidate"] for step, metrics in self.tracker.logged if step is not None]:
+            params = result["results"][candidate]["params"]
+            for name, value in params.items():
+                self.assertEqual(self.tracker.params[f"candidate_{candidate}/{name}"], value)
+        self.assertEqual(len(self.tracker.params), 8)
+        self.assertTrue(os.path.exists(self.model_manager.model_path))
+        self.assertEqual(
+            self.model_manager.model.named_steps["tfidf"].max_features, result["best_params"]["tfidf__max_features"]
+        )
+
+    def test_cross_validate(self):
+        # Per-fold and aggregate metrics are returned and optionally logged
+        result = self.model_manager.cross_validate(k=3, num_iterations=5, n_jobs=2, log_metrics=True)
+        self.assertEqual(len(result["folds"]), 3)
+        self.assertAlmostEqual(
+            result["mean"]["cv_mean_accuracy"], sum(fold["val_accuracy"] for fold in result["folds"]) / 3
+        )
+        self.assertEqual([step for step, metrics in self.tracker.logged], [0, 1, 2, None])
+        self.assertFalse(os.path.exists(self.model_manager.model_path))
+
+    def test_update(self):
+        # Updates write a new model version and promote it to model_path
+        self.model_manager.train(num_iterations=5)
+        coef_before = self.model_manager.model.named_steps["clf"].coef_.copy()
+
+        texts = ["Absolutely fantastic support", "Worst experience ever"]
+        first_version = self.model_manager.update(texts, ["POSITIVE", "NEGATIVE"])
+        second_version = self.model_manager.update(texts, ["POSITIVE", "NEGATIVE"])
+        self.assertTrue(first_version.endswith("sentiment_model.v0001.joblib"))
+        self.assertTrue(second_version.endswith("sentiment_model.v0002.joblib"))
+
+        reloaded = ModelManager(project_root=self.test_dir)
+        reloaded.load_model()
+        coef_after = reloaded.model.named_steps["clf"].coef_
+        self.assertFalse((coef_after == coef_before).all())
+        self.assertTrue((coef_after == self.model_manager.model.named_steps["clf"].coef_).all())
+
+        # The artifact written by train() is refreshed with every update
+        scorer = LinearTextScorer.load(self.model_manager.artifact_path)
+        self.assertTrue((scorer.predict(texts) == self.model_manager.model.predict(texts)).all())
+        self.assertTrue(np.allclose(scorer.predict_proba(texts), self.model_manager.model.predict_proba(texts)))
+
+        with self.assertRaises(ValueError):
+            self.model_manager.update(["Meh"], ["NEUTRAL"])
+
+    def test_update_rejects_unexportable_model_before_saving(self):
+        # An artifact that cannot be refreshed fails the update without touching the saved model
+        self.model_manager.train(num_iterations=5)
+        artifact_copy = os.path.join(self.test_dir, "artifact_copy")
+        shutil.copytree(self.model_manager.artifact_path, artifact_copy)
+        self.model_manager.train_streaming(chunk_size=32)
+        shutil.copytree(artifact_copy, self.model_manager.artifact_path)
+        with open(self.model_manager.model_path, "rb") as f:
+            saved_model = f.read()
+
+        with self.assertRaises(ValueError):
+            self.model_manager.update(["Absolutely fantastic support"], ["POSITIVE"])
+        with open(self.model_manager.model_path, "rb") as f:
+            self.assertEqual(f.read(), saved_model)
+        self.assertEqual(self.model_manager._latest_model_version(), 0)
+
+
+if __name__ == "__main__":
     unittest.main()
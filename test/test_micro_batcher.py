@@ -0,0 +1,43 @@
+import asyncio
+import unittest
+
+from src.ds_ticat.MicroBatcher import MicroBatcher
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.batches = []
+
+    def predict_batch(self, texts):
+        self.batches.append(list(texts))
+        return [text.upper() for text in texts], [len(text) for text in texts]
+
+    def run_concurrently(self, batcher, texts):
+        async def run():
+            await batcher.start()
+            try:
+                return await asyncio.gather(*(batcher.predict(text) for text in texts))
+            finally:
+                await batcher.stop()
+
+        return asyncio.run(run())
+
+    def test_groups_concurrent_requests(self):
+        # Concurrent requests are scored together, bounded by max_batch_size
+        batcher = MicroBatcher(self.predict_batch, max_batch_size=4, max_wait_ms=50)
+        texts = [f"text {i}" for i in range(10)]
+        results = self.run_concurrently(batcher, texts)
+        self.assertEqual(results, [(text.upper(), len(text)) for text in texts])
+        self.assertEqual([len(batch) for batch in self.batches], [4, 4, 2])
+
+    def test_propagates_errors(self):
+        def failing_predict_batch(texts):
+            raise RuntimeError("model failed")
+
+        batcher = MicroBatcher(failing_predict_batch, max_wait_ms=1)
+        with self.assertRaises(RuntimeError):
+            self.run_concurrently(batcher, ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
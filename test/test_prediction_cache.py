@@ -0,0 +1,145 @@
+import threading
+import unittest
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import Pipeline
+
+from src.ds_ticat.PredictionCache import PredictionCache
+
+
+class FakeModel:
+    def __init__(self, lowercase=True, token_pattern=r"(?u)\b\w\w+\b"):
+        self.lowercase = lowercase
+        self.token_pattern = token_pattern
+
+
+class FakeModelManager:
+    def __init__(self, delay_event=None, model=None):
+        self.model = model if model is not None else FakeModel()
+        self.model_version = "v1"
+        self.batches = []
+        self.delay_event = delay_event
+
+    def predict_batch(self, texts):
+        self.batches.append(list(texts))
+        if self.delay_event is not None:
+            self.delay_event.wait(5)
+        return [f"{self.model_version}:{text.lower()}" for text in texts], [0.5] * len(texts)
+
+
+class TestPredictionCache(unittest.TestCase):
+    def test_hits_on_normalized_text(self):
+        model_manager = FakeModelManager()
+        cache = PredictionCache(maxsize=10)
+        self.assertEqual(cache.predict(model_manager, "Danke!"), ("v1:danke!", 0.5))
+        self.assertEqual(cache.predict(model_manager, "  danke "), ("v1:danke!", 0.5))
+        self.assertEqual(model_manager.batches, [["Danke!"]])
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_case_sensitive_model_keeps_case_in_key(self):
+        # A model that does not lowercase scores "Danke" and "danke" differently, so they get their own entries
+        model_manager = FakeModelManager(model=FakeModel(lowercase=False))
+        cache = PredictionCache(maxsize=10)
+        cache.predict(model_manager, "Danke!")
+        cache.predict(model_manager, "danke")
+        cache.predict(model_manager, " Danke ")
+        self.assertEqual(model_manager.batches, [["Danke!"], ["danke"]])
+
+    def test_key_follows_pipeline_vectorizer(self):
+        model_manager = FakeModelManager(model=Pipeline([("tfidf", TfidfVectorizer(lowercase=False))]))
+        cache = PredictionCache(maxsize=10)
+        cache.predict_batch(model_manager, ["Danke", "danke", "Danke!"])
+        self.assertEqual(model_manager.batches, [["Danke", "danke"]])
+
+        # A new model version with other preprocessing gets its own normalization
+        model_manager.model = Pipeline([("tfidf", TfidfVectorizer(lowercase=True))])
+        model_manager.model_version = "v2"
+        cache.predict_batch(model_manager, ["Danke", "danke"])
+        self.assertEqual(model_manager.batches[-1], ["Danke"])
+
+    def test_custom_analysis_keys_raw_text(self):
+        model_manager = FakeModelManager(model=Pipeline([("tfidf", TfidfVectorizer(analyzer="char"))]))
+        cache = PredictionCache(maxsize=10)
+        cache.predict_batch(model_manager, ["a  b", "a b", "a b"])
+        self.assertEqual(model_manager.batches, [["a  b", "a b"]])
+
+    def test_batch_only_scores_uncached_texts_once(self):
+        model_manager = FakeModelManager()
+        cache = PredictionCache(maxsize=10)
+        cache.predict(model_manager, "a b")
+        labels, confidences = cache.predict_batch(model_manager, ["A B", "cd", "CD", "ef"])
+        self.assertEqual(labels, ["v1:a b", "v1:cd", "v1:cd", "v1:ef"])
+        self.assertEqual(model_manager.batches, [["a b"], ["cd", "ef"]])
+
+    def test_model_version_is_part_of_key(self):
+        model_manager = FakeModelManager()
+        cache = PredictionCache(maxsize=10)
+        cache.predict(model_manager, "hello")
+        model_manager.model_version = "v2"
+        self.assertEqual(cache.predict(model_manager, "hello"), ("v2:hello", 0.5))
+        self.assertEqual(cache.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        model_manager = FakeModelManager()
+        cache = PredictionCache(maxsize=2)
+        cache.predict_batch(model_manager, ["aa", "bb"])
+        cache.predict(model_manager, "aa")
+        cache.predict(model_manager, "cc")
+        self.assertEqual(cache.evictions, 1)
+        cache.predict_batch(model_manager, ["aa", "cc"])
+        self.assertEqual(len(model_manager.batches), 2)
+        cache.predict(model_manager, "bb")
+        self.assertEqual(model_manager.batches[-1], ["bb"])
+
+    def test_expires_entries_after_ttl(self):
+        now = [0.0]
+        model_manager = FakeModelManager()
+        cache = PredictionCache(maxsize=10, ttl=60, clock=lambda: now[0])
+        cache.predict(model_manager, "hello")
+        now[0] = 59
+        cache.predict(model_manager, "hello")
+        now[0] = 120
+        cache.predict(model_manager, "hello")
+        self.assertEqual(len(model_manager.batches), 2)
+        self.assertEqual(cache.expirations, 1)
+
+    def test_concurrent_identical_requests_compute_once(self):
+        release = threading.Event()
+        model_manager = FakeModelManager(delay_event=release)
+        cache = PredictionCache(maxsize=10)
+        results = []
+
+        def predict():
+            results.append(cache.predict(model_manager, "same"))
+
+        threads = [threading.Thread(target=predict) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while cache.stats()["hits"] < 4:
+            threading.Event().wait(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [("v1:same", 0.5)] * 5)
+        self.assertEqual(model_manager.batches, [["same"]])
+
+    def test_failed_prediction_is_not_cached(self):
+        def failing_predict_batch(texts):
+            raise RuntimeError("model failed")
+
+        model_manager = FakeModelManager()
+        model_manager.predict_batch = failing_predict_batch
+        cache = PredictionCache(maxsize=10)
+        with self.assertRaises(RuntimeError):
+            cache.predict(model_manager, "hello")
+        self.assertEqual(cache.stats()["in_flight"], 0)
+        self.assertEqual(cache.stats()["size"], 0)
+
+    def test_from_env(self):
+        self.assertIsNone(PredictionCache.from_env({"PREDICTION_CACHE_SIZE": "0"}))
+        cache = PredictionCache.from_env({"PREDICTION_CACHE_SIZE": "5", "PREDICTION_CACHE_TTL": "30"})
+        self.assertEqual((cache.maxsize, cache.ttl), (5, 30))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+import urllib.request
+from test.helpers import ROOT_DIR, free_port
+
+# Serves a WSGI app answering with the worker's pid, every worker records its pid in PID_DIR after the fork
+SERVER = """
+import os, sys
+import prefork_server
+
+def app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "text/plain")])
+    return [str(os.getpid()).encode("ascii")]
+
+def after_fork():
+    open(os.path.join(sys.argv[2], str(os.getpid())), "w").close()
+
+prefork_server.serve(app, host="127.0.0.1", port=int(sys.argv[1]), workers=2, threads=2, after_fork=after_fork)
+"""
+
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+class TestPreforkServer(unittest.TestCase):
+    def setUp(self):
+        self.pid_dir = tempfile.mkdtemp()
+        self.port = free_port()
+        python_path = [os.path.join(ROOT_DIR, "src"), os.path.join(ROOT_DIR, "infrastructure", "lambda")]
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(python_path))
+        self.server = subprocess.Popen(
+            [sys.executable, "-c", SERVER, str(self.port), self.pid_dir], env=env, stdout=subprocess.DEVNULL
+        )
+
+    def tearDown(self):
+        if self.server.poll() is None:
+            self.server.kill()
+            self.server.wait()
+        for name in os.listdir(self.pid_dir):
+            if is_running(int(name)):
+                os.kill(int(name), signal.SIGKILL)
+        shutil.rmtree(self.pid_dir)
+
+    def wait_for_workers(self, count, timeout=10):
+        deadline = time.monotonic() + timeout
+        while len(os.listdir(self.pid_dir)) < count and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return sorted(int(name) for name in os.listdir(self.pid_dir))
+
+    def get(self):
+        with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/", timeout=5) as response:
+            return response.status, int(response.read())
+
+    def test_serves_from_forked_workers_and_stops_on_sigterm(self):
+        workers = self.wait_for_workers(2)
+        self.assertEqual(len(workers), 2)
+        self.assertNotIn(self.server.pid, workers)
+
+        for _ in range(10):
+            status, pid = self.get()
+            self.assertEqual(status, 200)
+            self.assertIn(pid, workers)
+
+        self.server.send_signal(signal.SIGTERM)
+        self.assertEqual(self.server.wait(timeout=10), 0)
+        for pid in workers:
+            self.assertFalse(is_running(pid))
+        with self.assertRaises(OSError):
+            self.get()
+
+    def test_restarts_dead_worker(self):
+        workers = self.wait_for_workers(2)
+        os.kill(workers[0], signal.SIGKILL)
+        self.assertEqual(len(self.wait_for_workers(3)), 3)
+        status, pid = self.get()
+        self.assertEqual(status, 200)
+        self.assertNotEqual(pid, workers[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
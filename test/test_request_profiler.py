@@ -0,0 +1,57 @@
+import glob
+import os
+import pstats
+import shutil
+import tempfile
+import unittest
+
+from src.ds_ticat.RequestProfiler import RequestProfiler
+
+
+def handle_request():
+    return sum(range(100))
+
+
+class TestRequestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def run_requests(self, profiler, n):
+        for _ in range(n):
+            with profiler.profile():
+                handle_request()
+
+    def test_profiles_one_in_every_requests(self):
+        profiler = RequestProfiler(every=3, directory=self.directory, dump_every=2)
+        self.run_requests(profiler, 12)
+        paths = glob.glob(os.path.join(self.directory, "profile-*.prof"))
+        self.assertEqual(len(paths), 1)
+
+        stats = pstats.Stats(paths[0])
+        calls = [value[1] for key, value in stats.stats.items() if key[2] == "handle_request"]
+        self.assertEqual(calls, [4])
+
+    def test_bounds_number_of_files(self):
+        profiler = RequestProfiler(every=1, directory=self.directory, dump_every=1, requests_per_file=2, max_files=3)
+        self.run_requests(profiler, 20)
+        self.assertEqual(len(glob.glob(os.path.join(self.directory, "profile-*.prof"))), 3)
+
+    def test_disabled_by_default(self):
+        profiler = RequestProfiler.from_env({"TICAT_PROFILE_DIR": self.directory})
+        self.assertFalse(profiler.enabled)
+        self.run_requests(profiler, 5)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_skips_sample_while_another_request_is_profiled(self):
+        profiler = RequestProfiler(every=1, directory=self.directory, dump_every=1)
+        with profiler.profile():
+            with profiler.profile():
+                handle_request()
+        stats = pstats.Stats(profiler.dump())
+        self.assertEqual(profiler._profiled, 1)
+        self.assertTrue(stats.stats)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from test.helpers import (
+    import_serving_module,
+    install_sagemaker_inference_stub,
+    make_project,
+)
+
+from src.ds_ticat.LinearTextScorer import remove_artifact
+
+
+class TestSagemakerEntrypoint(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_manager = make_project(num_iterations=5)
+        cls.remove_stub = install_sagemaker_inference_stub()
+        # Importing the entrypoint defaults METRICS_DIR for the model server workers
+        cls.saved_metrics_dir = os.environ.get("METRICS_DIR")
+        cls.module, cls.restore_imports = import_serving_module("entrypoint", "sagemaker", cls.model_manager.model_dir)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.restore_imports()
+        cls.remove_stub()
+        if cls.saved_metrics_dir is None:
+            os.environ.pop("METRICS_DIR", None)
+        shutil.rmtree(cls.model_manager.project_root)
+
+    def setUp(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        self.module.SERVICE_CONFIG = os.path.join(config_dir, "service.config")
+        self.write_config(workers=None)
+
+        saved_workers = os.environ.pop("SAGEMAKER_MODEL_SERVER_WORKERS", None)
+        self.addCleanup(self.restore_workers, saved_workers)
+
+    def write_config(self, workers):
+        with open(self.module.SERVICE_CONFIG, "w") as f:
+            json.dump({"workers": workers}, f)
+
+    def restore_workers(self, saved_workers):
+        os.environ.pop("SAGEMAKER_MODEL_SERVER_WORKERS", None)
+        if saved_workers is not None:
+            os.environ["SAGEMAKER_MODEL_SERVER_WORKERS"] = saved_workers
+
+    def configured_workers(self, shared_model):
+        os.environ.pop("SAGEMAKER_MODEL_SERVER_WORKERS", None)
+        self.module.configure_workers(shared_model)
+        return int(os.environ["SAGEMAKER_MODEL_SERVER_WORKERS"])
+
+    def test_exports_missing_artifact_from_joblib_model(self):
+        remove_artifact(self.model_manager.artifact_path)
+        self.assertTrue(self.module.ensure_inference_artifact(self.model_manager.model_dir))
+        self.assertTrue(os.path.exists(self.model_manager.artifact_path))
+
+    def test_missing_model_has_no_artifact(self):
+        missing_dir = os.path.join(self.model_manager.project_root, "unknown_model")
+        self.assertFalse(self.module.ensure_inference_artifact(missing_dir))
+
+    def test_unexportable_model_has_no_artifact(self):
+        streaming = make_project()
+        self.addCleanup(shutil.rmtree, streaming.project_root)
+        streaming.train_streaming(chunk_size=32)
+        self.assertFalse(self.module.ensure_inference_artifact(streaming.model_dir))
+        self.assertFalse(os.path.exists(streaming.artifact_path))
+
+    def test_workers_default_to_cpus_only_with_shared_artifact(self):
+        self.assertEqual(self.configured_workers(shared_model=True), self.module.available_cpus())
+        self.assertEqual(self.configured_workers(shared_model=False), 1)
+
+    def test_configured_and_explicit_workers_win(self):
+        self.write_config(workers=3)
+        self.assertEqual(self.configured_workers(shared_model=False), 3)
+        os.environ["SAGEMAKER_MODEL_SERVER_WORKERS"] = "5"
+        self.module.configure_workers(shared_model=True)
+        self.assertEqual(os.environ["SAGEMAKER_MODEL_SERVER_WORKERS"], "5")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import glob
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from test.helpers import (
+    import_serving_module,
+    install_sagemaker_inference_stub,
+    load_texts,
+    make_project,
+)
+from types import SimpleNamespace
+
+
+class TestContainerModelInferenceHandler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_manager = make_project(num_iterations=5)
+        cls.model_dir = cls.model_manager.model_dir
+        cls.remove_stub = install_sagemaker_inference_stub()
+        cls.module, cls.restore_imports = import_serving_module("inference_handler", "sagemaker", cls.model_dir)
+        cls.texts = load_texts(3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.restore_imports()
+        cls.remove_stub()
+        shutil.rmtree(cls.model_manager.project_root)
+
+    def setUp(self):
+        self.module.ContainerModelInferenceHandler._model_registry.clear()
+        self.handler = self.module.ContainerModelInferenceHandler()
+
+    def expected_labels(self, texts):
+        labels, confidences = self.model_manager.predict_batch(texts)
+        return [str(label) for label in labels]
+
+    def test_input_fn_json(self):
+        input_fn = self.handler.default_input_fn
+        self.assertEqual(input_fn(b'"hello"', "application/json"), "hello")
+        self.assertEqual(input_fn(b'{"text": "hello"}', "application/json; charset=utf-8"), "hello")
+        self.assertEqual(input_fn(b'["a", {"text": "b"}]', "application/json"), ["a", "b"])
+        self.assertEqual(input_fn(b'{"texts": ["a", "b"]}', "application/json"), ["a", "b"])
+        with self.assertRaises(ValueError):
+            input_fn(b'{"body": "a"}', "application/json")
+        with self.assertRaises(ValueError):
+            input_fn(b"hello", "text/plain")
+
+    def test_input_fn_jsonlines(self):
+        body = '{"text": "a"}\n"b"\n\n{"text": "c"}\n'
+        for content_type in ("application/jsonlines", "application/jsonl"):
+            self.assertEqual(self.handler.default_input_fn(body, content_type), ["a", "b", "c"])
+
+    def test_input_fn_csv_keeps_one_text_per_line(self):
+        # Without a declared header, a row "text" is a ticket text and blank lines stay empty texts
+        self.assertEqual(self.handler.default_input_fn(b"text\n\nhallo\n", "text/csv"), ["text", "", "hallo"])
+        self.assertEqual(self.handler.default_input_fn(b'"a, b"\nc\n', "text/csv"), ["a, b", "c"])
+
+    def test_input_fn_csv_with_header(self):
+        body = b"id,text\n1,hallo\n2,\n3\n"
+        self.assertEqual(self.handler.default_input_fn(body, 'text/csv; header="present"'), ["hallo", "", ""])
+        self.assertEqual(self.handler.default_input_fn(b"content\na\n", "text/csv; header=present"), ["a"])
+
+    def test_predict_fn(self):
+        model = self.handler.default_model_fn(self.model_dir)
+        label, confidence, model_id = self.handler.default_predict_fn(self.texts[0], model)
+        self.assertEqual(str(label), self.expected_labels(self.texts[:1])[0])
+        self.assertEqual(model_id, self.module.MODEL_ID)
+
+        batch = self.handler.default_predict_fn(self.texts, model)
+        self.assertEqual([str(label) for label in batch["labels"]], self.expected_labels(self.texts))
+        self.assertEqual(self.handler.default_predict_fn([], model)["labels"], [])
+
+    def test_output_fn(self):
+        single = ["POSITIVE", 0.75, "model"]
+        batch = {"labels": ["POSITIVE", "NEGATIVE"], "confidences": [0.75, 0.5], "model_id": "model"}
+        output_fn = self.handler.default_output_fn
+
+        self.assertEqual(
+            json.loads(output_fn(single, "application/json")),
+            {"label": "POSITIVE", "confidence": 0.75, "model_id": "model"},
+        )
+        records = json.loads(output_fn(batch, None))
+        self.assertEqual([record["label"] for record in records], ["POSITIVE", "NEGATIVE"])
+        lines = output_fn(batch, "application/jsonlines").splitlines()
+        self.assertEqual([json.loads(line)["confidence"] for line in lines], [0.75, 0.5])
+        self.assertEqual(output_fn(batch, "text/csv"), "POSITIVE,0.75,model\nNEGATIVE,0.5,model\n")
+
+        with self.assertRaises(ValueError):
+            output_fn(single, "text/csv")
+        with self.assertRaises(ValueError):
+            output_fn(batch, "text/html")
+
+    def test_registry_reuses_loaded_model(self):
+        first = self.handler.default_model_fn(self.model_dir)
+        second = self.module.ContainerModelInferenceHandler().default_model_fn(self.model_dir)
+        self.assertIs(first, second)
+        self.assertEqual(list(self.module.ContainerModelInferenceHandler._model_registry), [self.model_dir])
+
+    def test_unknown_model_dir_is_not_registered(self):
+        missing_dir = os.path.join(self.model_manager.project_root, "unknown_model")
+        with self.assertRaises(FileNotFoundError):
+            self.handler.default_model_fn(missing_dir)
+        self.assertNotIn(missing_dir, self.module.ContainerModelInferenceHandler._model_registry)
+
+    def test_handle_switches_to_the_context_model(self):
+        other = make_project(num_iterations=5)
+        self.addCleanup(shutil.rmtree, other.project_root)
+        self.handler.initialize(self.model_dir)
+        context = SimpleNamespace(
+            model_name="other", model_dir=other.model_dir, request_content_type="text/csv", accept="text/csv"
+        )
+        output = self.handler.handle("\n".join(self.texts).encode("utf-8"), context)
+        self.assertEqual([line.split(",")[0] for line in output.splitlines()], self.expected_labels(self.texts))
+        self.assertEqual(self.handler.model_manager.model_dir, other.model_dir)
+
+
+class TestHandlerService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_manager = make_project(num_iterations=5)
+        cls.remove_stub = install_sagemaker_inference_stub()
+        cls.module, cls.restore_imports = import_serving_module(
+            "model_handler", "sagemaker", cls.model_manager.model_dir, unload=["inference_handler"]
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.restore_imports()
+        cls.remove_stub()
+        shutil.rmtree(cls.model_manager.project_root)
+
+    def test_handle_profiles_and_times_requests(self):
+        # The model server only calls HandlerService.handle, so profiling and the request stage are hooked there
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.module.PROFILER = type(self.module.PROFILER)(every=1, directory=directory, dump_every=1)
+        count_before = self.module.METRICS.summary().get("request", {}).get("count", 0)
+
+        context = SimpleNamespace(
+            model_name="model",
+            model_dir=self.model_manager.model_dir,
+            request_content_type="application/jsonlines",
+            accept="application/jsonlines",
+        )
+        output = self.module.HandlerService().handle('{"text": "a"}\n{"text": "b"}\n', context)
+        self.assertEqual(len(output.splitlines()), 2)
+        self.assertEqual(len(glob.glob(os.path.join(directory, "profile-*.prof"))), 1)
+        self.assertEqual(self.module.METRICS.summary()["request"]["count"], count_before + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import html
+import random
+import re
+import time
+import unittest
+
+from src.ds_ticat.TextPreProcessor import TextPreProcessor
+
+
+def reference_process_text(text):
+    # The original ten-pass pipeline, kept verbatim to check that the fused passes give identical output
+    text = re.sub(r"@media[^{]+\{(?:[^{}]+|\{[^{}]*\})*\}", "", text)
+    text = re.sub(r"\[cid:image[^\]]+\]", "", text)
+    text = re.sub(r"[\n\r]+", " ", text)
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"&nbsp;", " ", text)
+    text = html.unescape(text)
+    text = re.sub(r'[,.!?"]+', " ", text)
+    text = re.sub(r"[^\w\s]", " ", text, flags=re.UNICODE)
+    text = re.sub(r"\d+", " ", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.lower()
+
+
+FRAGMENTS = [
+    "@media",
+    "@media screen",
+    "{",
+    "}",
+    "{{",
+    "}}",
+    "[cid:image",
+    "[cid:image001.png@01D]",
+    "]",
+    "<",
+    ">",
+    "<br>",
+    "<p class='x'>",
+    "</p>",
+    "&nbsp;",
+    "&amp;",
+    "&amp;nbsp;",
+    "&lt;b&gt;",
+    "&#228;",
+    "&auml;",
+    "&",
+    ";",
+    "\n",
+    "\r\n",
+    "\t",
+    " ",
+    "  ",
+    "\xa0",
+    " ",
+    "123",
+    "4",
+    "²",
+    "٣",
+    "_",
+    "a",
+    "Ä",
+    "ß",
+    "Straße",
+    "İ",
+    "Grüße",
+    "Danke",
+    ",",
+    ".",
+    "!",
+    "?",
+    '"',
+    "'",
+    "-",
+    "€",
+    "😀",
+    "\x00",
+]
+
+CASES = [
+    "",
+    "   ",
+    "Hallo Team,\r\n\r\nich habe eine Frage zur Rechnung Nr. 12345!",
+    "<html><head><style>@media only screen and (max-width: 600px) { .a { color: red; } }</style></head>"
+    "<body><p>Vielen&nbsp;Dank &amp; Grüße</p>[cid:image001.png@01D9A2B3.C4D5E6F0]</body></html>",
+    "@media print { body { display: none } } Text danach",
+    "@media broken { no closing brace",
+    "[cid:image without end",
+    "a <unterminated tag",
+    "&lt;b&gt;fett&lt;/b&gt; und &#x41;&#66;",
+    "snake_case und CamelCase 3D-Druck ²³ ٣٤",
+    "Straße İstanbul ΣΑΣ",
+]
+
+
+class TestTextPreProcessor(unittest.TestCase):
+    def setUp(self):
+        self.processor = TextPreProcessor()
+
+    def test_matches_reference_pipeline(self):
+        for text in CASES:
+            self.assertEqual(self.processor.process_text(text), reference_process_text(text), repr(text))
+
+    def test_matches_reference_pipeline_on_fuzzed_input(self):
+        rng = random.Random(0)
+        for _ in range(3000):
+            text = "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 30)))
+            if "@media" in text:
+                # The reference media query pattern backtracks exponentially on unclosed braces
+                text = text[:24]
+            self.assertEqual(self.processor.process_text(text), reference_process_text(text), repr(text))
+
+    def test_scanners_match_patterns(self):
+        # Small alphabets hit the brace, bracket and tag edge cases far more often than the fragments above
+        rng = random.Random(1)
+        cases = [
+            (self.processor.remove_media_queries, TextPreProcessor.MEDIA_QUERY_PATTERN, "", ["@media", "{", "}", "a"]),
+            (self.processor.remove_cid_images, TextPreProcessor.CID_IMAGE_PATTERN, "", ["[cid:image", "]", "x"]),
+            (self.processor.remove_html_tags, TextPreProcessor.HTML_TAG_PATTERN, " ", ["<", ">", "a", "\n"]),
+        ]
+        for scanner, pattern, replacement, alphabet in cases:
+            for _ in range(3000):
+                # Capped like above, since the reference media query pattern backtracks exponentially
+                text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))[:24]
+                self.assertEqual(scanner(text), pattern.sub(replacement, text), repr(text))
+
+    def test_adversarial_input_runs_in_bounded_time(self):
+        n = 200_000
+        adversarial = [
+            "@media x {" + "a" * n,
+            "@media x {" + "a{" * n,
+            "@media" * n,
+            "@media {" * n,
+            "[cid:image" * n,
+            "<" * n,
+            "<a" * n + "\n" * n,
+        ]
+        start = time.perf_counter()
+        for text in adversarial:
+            self.processor.process_text(text)
+        self.assertLess(time.perf_counter() - start, 10)
+
+    def test_truncates_long_input(self):
+        processor = TextPreProcessor(max_input_chars=10)
+        self.assertEqual(processor.process_text("Hallo Welt und mehr"), "hallo welt")
+
+    def test_step_methods_match_pipeline(self):
+        for text in CASES:
+            processed = text
+            for step in (
+                self.processor.remove_media_queries,
+                self.processor.remove_cid_images,
+                self.processor.remove_newlines,
+                self.processor.remove_html_tags,
+                self.processor.replace_html_spaces,
+                self.processor.unescape_html,
+                self.processor.remove_punctuation,
+                self.processor.remove_numbers,
+                self.processor.normalize_whitespace,
+                self.processor.to_lowercase,
+            ):
+                processed = step(processed)
+            self.assertEqual(processed, self.processor.process_text(text))
+
+    def test_process_batch(self):
+        self.assertEqual(self.processor.process_batch(CASES), [reference_process_text(text) for text in CASES])
+        self.assertEqual(self.processor.process_batch([]), [])
+
+    def test_invalid_input_is_returned_unchanged(self):
+        self.assertIsNone(self.processor.process_text(None))
+
+
+if __name__ == "__main__":
+    unittest.main()